@@ -0,0 +1,124 @@
+"""
+Benchmark chain-position computation in preprocess_code_structure
+Compares the single forward pass against the previous per-function backward walk
+on synthetic scenes of 100 to 10,000 lines
+
+Run from the repo root:
+    python benchmarks/bench_chain_positions.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import hydra_code_parser
+from manual_triggers_fixed import preprocess_code_structure
+
+SOURCES = ['osc({}, 0.1, 1.2)', 'noise({}, 0.1)', 'voronoi({}, 0.3, 0.3)', 'shape({}, 0.5, 0.01)']
+CHAINED = ['.rotate({}, 0.1)', '.color({}, 0.5, 0.2)', '.scale({})', '.kaleid({})',
+           '.modulate(noise({}), 0.2)', '.pixelate({}, 20)', '.repeat({}, 3)']
+
+# The old backward walk is quadratic - skip it above this size (10k lines takes a few seconds)
+BASELINE_MAX_LINES = 10000
+
+
+def generate_scene(num_lines, chain_length=12, seed=1):
+    """Generate a scene of long chains: a source line followed by chained lines"""
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < num_lines:
+        lines.append(rng.choice(SOURCES).format(rng.randint(1, 60)))
+        for _ in range(chain_length):
+            lines.append('  ' + rng.choice(CHAINED).format(round(rng.random() * 4, 3)))
+        lines.append('  .out()')
+        lines.append('')
+    return '\n'.join(lines[:num_lines])
+
+
+def preprocess_code_structure_baseline(code_text):
+    """The previous implementation - linear line lookup and backward walks per function"""
+    all_functions = list(re.finditer(r'(\w+)\s*\(', code_text))
+    func_info_map = {}
+
+    lines = code_text.split('\n')
+    line_starts = [0]
+    for line in lines[:-1]:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+
+    for func_match in all_functions:
+        func_pos = func_match.start()
+
+        func_line_idx = 0
+        for i, start in enumerate(line_starts):
+            if func_pos >= start:
+                func_line_idx = i
+            else:
+                break
+
+        chain_position = 0
+        for idx in range(func_line_idx, -1, -1):
+            stripped = lines[idx].strip()
+            if not stripped:
+                continue
+            if stripped.startswith('.'):
+                if idx < func_line_idx:
+                    chain_position += 1
+            else:
+                break
+
+        if lines[func_line_idx].strip().startswith('.'):
+            for idx in range(func_line_idx, -1, -1):
+                stripped = lines[idx].strip()
+                if not stripped:
+                    continue
+                if stripped.startswith('.'):
+                    chain_position += 1
+                    break
+                else:
+                    break
+
+        func_info_map[func_pos] = {'name': func_match.group(1).lower(),
+                                   'chain_position': chain_position}
+
+    return func_info_map
+
+
+def best_of(func, repeat=3):
+    """Best wall-clock time of func() in milliseconds, and its result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(sizes=(100, 1000, 2000, 5000, 10000)):
+    print(f"{'lines':>8} {'calls':>8} {'forward pass':>14} {'baseline':>12} {'speedup':>9}")
+    for num_lines in sizes:
+        code_text = generate_scene(num_lines)
+        parsed = hydra_code_parser.parse_scene(code_text)
+
+        new_ms, new_map = best_of(lambda: preprocess_code_structure(code_text, parsed))
+
+        if num_lines <= BASELINE_MAX_LINES:
+            old_ms, old_map = best_of(lambda: preprocess_code_structure_baseline(code_text), repeat=1)
+
+            # Same chain positions for every call
+            mismatches = [pos for pos, info in new_map.items()
+                          if old_map[pos]['chain_position'] != info['chain_position']]
+            if mismatches:
+                print(f"  MISMATCH at {len(mismatches)} calls, first at char {mismatches[0]}")
+
+            print(f"{num_lines:>8} {len(parsed.calls):>8} {new_ms:>12.2f}ms {old_ms:>10.2f}ms {old_ms / new_ms:>8.0f}x")
+        else:
+            print(f"{num_lines:>8} {len(parsed.calls):>8} {new_ms:>12.2f}ms {'(skipped)':>12}")
+
+
+if __name__ == '__main__':
+    run()
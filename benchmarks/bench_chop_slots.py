@@ -0,0 +1,89 @@
+"""
+Benchmark {{chop.channel}} template expansion (scripts/chop_slots.py)
+Checks the expansion of the cases below, then times expand_template on the
+generated corpus with every 4th literal turned into a template reference
+
+Only arguments of Hydra transforms may become arrow functions - Hydra calls
+those per frame, but Math.sin(() => ...) is NaN.
+
+Run from the repo root:
+    python benchmarks/bench_chop_slots.py
+"""
+
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+
+import chop_slots
+from scene_corpus import corpus
+
+REPEAT = 5
+
+# Expansions the expander must get right ({{lfo1}} is slot 0, {{lfo2}} slot 1)
+CASES = [
+    ('osc({{lfo1}} * 20 + 10, 0.1)',
+     'osc(() => (window.tdSlots[0] * 20 + 10), 0.1)'),
+    ('osc(10).rotate(() => Math.sin({{lfo1}}))',
+     'osc(10).rotate(() => Math.sin(window.tdSlots[0]))'),
+    ('osc(Math.max({{lfo1}}, 2))',
+     'osc(() => (Math.max(window.tdSlots[0], 2)))'),
+    ('modulate(noise({{lfo2}}), {{lfo1}} * 0.5).out()',
+     'modulate(noise(() => (window.tdSlots[1])), () => (window.tdSlots[0] * 0.5)).out()'),
+    ('speed = {{lfo1}}',
+     'speed = window.tdSlots[0]'),
+]
+
+
+def with_references(code_text):
+    """Turn every 4th literal into a {{...}} template"""
+    count = [0]
+
+    def replace(match):
+        count[0] += 1
+        return f'{{{{lfo{count[0] % 8}}}}}' if count[0] % 4 == 0 else match.group()
+    return re.sub(r'(?<![\w.])\d+\.?\d*', replace, code_text)
+
+
+def check_cases():
+    ok = True
+    for code_text, expected in CASES:
+        table = chop_slots.ChopSlotTable()
+        table.slot('lfo1')
+        table.slot('lfo2')
+        found = chop_slots.expand_template(code_text, table)
+        status = 'ok' if found == expected else 'FAIL'
+        ok = ok and found == expected
+        print(f"  {status:<4} {code_text}")
+        print(f"       {found}")
+    return ok
+
+
+def main():
+    print("Cases:")
+    ok = check_cases()
+
+    print()
+    header = f"{'scene':<14} {'chars':>8} {'refs':>6} {'expand':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, code_text in corpus():
+        code_text = with_references(code_text)
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            chop_slots.expand_template(code_text, chop_slots.ChopSlotTable())
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:<14} {len(code_text):>8} {code_text.count('{{'):>6} {best:>8.2f}ms")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
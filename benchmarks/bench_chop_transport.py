@@ -0,0 +1,78 @@
+"""
+Benchmark the packed CHOP transport against the JSON transport
+Compares Python-side encode time and payload size per update for a
+typical bridge load: 4 LFOs, a 16-channel MIDI CHOP and an audio spectrum,
+then full JSON updates against delta-only updates when most CHOPs sit still
+
+Run from the repo root:
+    python benchmarks/bench_chop_transport.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from chop_transport import ChopDeltaEncoder, ChopPacker
+
+UPDATES = 600  # 10 seconds at 60 Hz
+
+
+def generate_chops(spectrum_bins, rng):
+    chops = {f'lfo{i}': rng.random((1, 1)) for i in range(1, 5)}
+    chops['midi'] = rng.random((16, 1))
+    chops['audio_spectrum'] = rng.random((1, spectrum_bins))
+    return chops
+
+
+def encode_json(chops):
+    """The JSON transport - one list of values per CHOP"""
+    return json.dumps({name: values.ravel().tolist() for name, values in chops.items()})
+
+
+def run(sizes=(64, 256, 1024, 4096)):
+    rng = np.random.default_rng(1)
+    print(f"{'bins':>6} {'json':>12} {'packed':>12} {'json size':>11} {'packed size':>12}")
+    for bins in sizes:
+        frames = [generate_chops(bins, rng) for _ in range(UPDATES)]
+
+        start = time.perf_counter()
+        json_bytes = sum(len(encode_json(chops)) for chops in frames)
+        json_ms = (time.perf_counter() - start) * 1000 / UPDATES
+
+        packer = ChopPacker()
+        start = time.perf_counter()
+        packed_bytes = sum(len(call) for chops in frames for call in packer.scripts(chops))
+        packed_ms = (time.perf_counter() - start) * 1000 / UPDATES
+
+        print(f"{bins:>6} {json_ms:>10.3f}ms {packed_ms:>10.3f}ms "
+              f"{json_bytes // UPDATES:>10}B {packed_bytes // UPDATES:>11}B")
+
+
+def run_deltas(moving_fractions=(0.0, 0.1, 0.5, 1.0), bins=256):
+    """Payload per update when only some MIDI channels and spectrum bins move"""
+    rng = np.random.default_rng(2)
+    print(f"\n{'moving':>7} {'full json':>11} {'delta json':>11} {'skipped':>8}")
+    for fraction in moving_fractions:
+        chops = generate_chops(bins, rng)
+        encoder = ChopDeltaEncoder()
+        full_bytes = 0
+        delta_bytes = 0
+        for _ in range(UPDATES):
+            for name in ('midi', 'audio_spectrum'):
+                values = chops[name].ravel()
+                moving = rng.random(values.size) < fraction
+                values[moving] = rng.random(int(moving.sum()))
+            full_bytes += len(encode_json(chops))
+            delta_bytes += len(encoder.encode(chops) or '')
+
+        print(f"{fraction:>6.0%} {full_bytes // UPDATES:>10}B {delta_bytes // UPDATES:>10}B {encoder.skipped:>8}")
+
+
+if __name__ == '__main__':
+    run()
+    run_deltas()
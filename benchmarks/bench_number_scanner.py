@@ -0,0 +1,127 @@
+"""
+Benchmark number-literal scanning
+Compares hydra_code_parser.parse_scene against the original approach: one
+number regex, then per match a scan of every {{...}} and arrow range and a
+30-character preceding-text search for each skip pattern
+
+Also counts what each finds - the old regex picks up digits inside
+identifiers (o0, s1, lfo2) and splits exponents (1e-3 -> 1, -3), each a
+useless parameter. The +refs scenes turn some literals into {{...}} templates
+and arrow functions, which the old approach range-checked per number.
+Only those get faster; on scenes without refs the scanner is level with the
+old regex or somewhat slower (it also tokenizes calls), so read the speedup
+column per scene rather than as one figure.
+
+Run from the repo root:
+    python benchmarks/bench_number_scanner.py
+"""
+
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+
+import hydra_code_parser
+from scene_corpus import corpus
+
+REPEAT = 5
+
+# Literals the scanner must get right
+CASES = [
+    ('osc(10, -0.1, 1e-3).out(o0)', ['10', '-0.1', '1e-3']),
+    ('src(s1).blend(o2, .5).rotate(lfo2 * 2)', ['.5', '2']),
+    ('shape(4, 1.5E+2).scale(x - 2, 0x1F)', ['4', '1.5E+2', '2']),
+    ('noise(3).modulate(o1, -.25).out(o3)', ['3', '-.25']),
+]
+
+
+def with_references(code_text):
+    """Turn every 4th literal into a {{...}} template and every 7th into an arrow function"""
+    count = [0]
+
+    def replace(match):
+        count[0] += 1
+        if count[0] % 4 == 0:
+            return '{{lfo1}}'
+        if count[0] % 7 == 0:
+            return '() => time * 0.5'
+        return match.group()
+    return re.sub(r'(?<![\w.])\d+\.?\d*', replace, code_text)
+
+
+def legacy_numbers(code_text):
+    """The scan sync_now and apply_now used before hydra_code_parser"""
+    all_matches = list(re.finditer(r'-?\d+\.?\d*|-?\.\d+', code_text))
+    brace_ranges = [(b.start(), b.end()) for b in re.finditer(r'\{\{[^}]*\}\}', code_text)]
+    arrow_ranges = [(a.start(), a.end()) for a in re.finditer(r'\([^)]*\)\s*=>\s*[^,)]*', code_text)]
+
+    valid_matches = []
+    for match in all_matches:
+        start_pos = match.start()
+        inside_braces = any(block_start <= start_pos < block_end for block_start, block_end in brace_ranges)
+        inside_arrow = any(arrow_start <= start_pos < arrow_end for arrow_start, arrow_end in arrow_ranges)
+        preceding_text = code_text[max(0, start_pos - 30):start_pos]
+        has_skip_pattern = any(skip_pattern in preceding_text for skip_pattern in [
+            'time', 'Math.', 'PI', 'frame', 'width', 'height', '=>'
+        ])
+        if inside_braces or inside_arrow or has_skip_pattern:
+            continue
+        valid_matches.append((match.group(), match.start(), match.end()))
+    return valid_matches
+
+
+def scanner_numbers(code_text):
+    return hydra_code_parser.parse_scene(code_text).numbers
+
+
+def best_ms(func, code_text):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(code_text)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_cases():
+    ok = True
+    for code_text, expected in CASES:
+        found = [num_str for num_str, start, end in scanner_numbers(code_text)]
+        legacy = [num_str for num_str, start, end in legacy_numbers(code_text)]
+        status = 'ok' if found == expected else 'FAIL'
+        ok = ok and found == expected
+        print(f"  {status:<4} {code_text}")
+        print(f"       scanner {found}")
+        print(f"       legacy  {legacy}")
+    return ok
+
+
+def main():
+    print("Cases:")
+    ok = check_cases()
+
+    print()
+    header = f"{'scene':<14} {'chars':>8} {'legacy':>10} {'scanner':>10} {'speedup':>8} {'legacy #':>9} {'scanner #':>10}"
+    print(header)
+    print('-' * len(header))
+    scenes = list(corpus())
+    scenes += [(name + '+refs', with_references(code_text)) for name, code_text in scenes
+               if name in ('medium', 'large')]
+    for name, code_text in scenes:
+        legacy_ms = best_ms(legacy_numbers, code_text)
+        scanner_ms = best_ms(scanner_numbers, code_text)
+        print(f"{name:<14} {len(code_text):>8} {legacy_ms:>8.2f}ms {scanner_ms:>8.2f}ms "
+              f"{legacy_ms / scanner_ms:>7.1f}x {len(legacy_numbers(code_text)):>9} "
+              f"{len(scanner_numbers(code_text)):>10}")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
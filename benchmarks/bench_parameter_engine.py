@@ -0,0 +1,204 @@
+"""
+Benchmark the parameter engine (scripts/manual_triggers_fixed.py) outside TouchDesigner
+Runs sync_now, apply_now, remove_unused_parameters, cleanup_and_sync and the
+per-scene parameter switch against a fake TD network (fake_td.py) for each
+scene in the generated corpus (scene_corpus.py)
+
+Run from the repo root:
+    python benchmarks/bench_parameter_engine.py
+    python benchmarks/bench_parameter_engine.py --scenes small medium --repeat 5
+    python benchmarks/bench_parameter_engine.py --save baseline.json
+    python benchmarks/bench_parameter_engine.py --compare baseline.json --tolerance 0.25
+    python benchmarks/bench_parameter_engine.py --scenes medium --stages
+
+Textport output is discarded while timing - the numbers are engine and
+parameter API cost, not console printing. --compare exits with status 1 if
+any timing is slower than the saved one by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_td
+import manual_triggers_fixed
+from scene_corpus import CORPUS, corpus, generate_scene
+
+
+def fresh_engine(scenes):
+    """Fake network with the given scenes, engine caches cleared"""
+    network = fake_td.build_network(scenes)
+    fake_td.install(manual_triggers_fixed, network)
+    manual_triggers_fixed.clear_plan_cache()
+    manual_triggers_fixed.invalidate_source_graph()
+    manual_triggers_fixed.invalidate_scene_cache()
+    manual_triggers_fixed.reset_sync_state()
+    manual_triggers_fixed.reset_parameter_ids()
+    manual_triggers_fixed._apply_memory.update(code_text=None, values={}, skipped=0)
+    manual_triggers_fixed.PER_SCENE_PARAMS = False
+    manual_triggers_fixed._scene_param_owners.clear()
+    return network
+
+
+def nudge_slider(network):
+    """Move the first float slider, as a user would before an apply"""
+    for par in network.param_page().pars:
+        if par.tupletName == par.name:
+            par.val = par.val + 1
+            return
+
+
+# Each case: (name, setup(code, other_code) -> network, action)
+# setup runs untimed; only the action is timed
+
+def setup_empty(code, other):
+    return fresh_engine([code, other])
+
+
+def setup_synced(code, other):
+    network = fresh_engine([code, other])
+    manual_triggers_fixed.sync_now()
+    return network
+
+
+def setup_nudged(code, other):
+    network = setup_synced(code, other)
+    nudge_slider(network)
+    return network
+
+
+def setup_switched(code, other):
+    network = setup_synced(code, other)
+    network.set_active_scene(2)
+    return network
+
+
+def setup_switched_per_scene(code, other):
+    """Both scenes synced once with per-scene parameter sets, then switch to the second"""
+    network = fresh_engine([code, other])
+    manual_triggers_fixed.PER_SCENE_PARAMS = True
+    manual_triggers_fixed.switch_scene_params()
+    network.set_active_scene(2)
+    manual_triggers_fixed.switch_scene_params()
+    network.set_active_scene(1)
+    manual_triggers_fixed.switch_scene_params()
+    network.set_active_scene(2)
+    return network
+
+
+CASES = [
+    ('sync (new params)', setup_empty, manual_triggers_fixed.sync_now),
+    ('sync (unchanged)', setup_synced, manual_triggers_fixed.sync_now),
+    ('sync (full)', setup_synced, lambda: manual_triggers_fixed.sync_now(incremental=False)),
+    ('apply', setup_nudged, manual_triggers_fixed.apply_now),
+    ('remove_unused', setup_switched, manual_triggers_fixed.remove_unused_parameters),
+    ('cleanup_and_sync', setup_switched, manual_triggers_fixed.cleanup_and_sync),
+    ('switch (per-scene)', setup_switched_per_scene, manual_triggers_fixed.switch_scene_params),
+]
+
+
+def time_case(setup, action, code, other, repeat):
+    """
+    Best time of action in milliseconds over repeat fresh setups,
+    plus the engine's mean ms per stage for the timed calls
+    """
+    best = None
+    stages = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            setup(code, other)
+            manual_triggers_fixed.clear_profile()
+            start = time.perf_counter()
+            action()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+            for record in manual_triggers_fixed.get_profile():
+                for stage, ms in record['stages'].items():
+                    stages[stage] = stages.get(stage, 0.0) + ms / repeat
+    return best, stages
+
+
+def print_stages(case_stages):
+    for case_name, stages in case_stages.items():
+        ordered = [stage for stage in manual_triggers_fixed.PROFILE_STAGES if stages.get(stage)]
+        print(f"    {case_name:<18} " + ', '.join(f"{stage} {stages[stage]:.2f}ms" for stage in ordered))
+
+
+def run(scene_names, repeat, stages=False):
+    results = {}
+    header = f"{'scene':<14} {'literals':>8} " + ' '.join(f"{name:>18}" for name, _, _ in CASES)
+    print(header)
+    print('-' * len(header))
+
+    for scene_name, code in corpus(scene_names):
+        literals, chain_depth, color_every = CORPUS[scene_name]
+        # Second scene for switching - half the size, different values
+        other = generate_scene(max(1, literals // 2), chain_depth, color_every, seed=2)
+
+        timings = {}
+        case_stages = {}
+        for case_name, setup, action in CASES:
+            timings[case_name], case_stages[case_name] = time_case(setup, action, code, other, repeat)
+        results[scene_name] = timings
+
+        print(f"{scene_name:<14} {literals:>8} " +
+              ' '.join(f"{timings[name]:>16.2f}ms" for name, _, _ in CASES))
+        if stages:
+            print_stages(case_stages)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a saved run - returns True if nothing regressed"""
+    ok = True
+    print(f"\nCompared to baseline (tolerance {tolerance:.0%}):")
+    for scene_name, timings in results.items():
+        for case_name, ms in timings.items():
+            old_ms = baseline.get(scene_name, {}).get(case_name)
+            if old_ms is None:
+                continue
+            ratio = ms / old_ms if old_ms > 0 else 1.0
+            if ratio > 1 + tolerance:
+                ok = False
+                print(f"  REGRESSION {scene_name} / {case_name}: {old_ms:.2f}ms -> {ms:.2f}ms ({ratio:.2f}x)")
+            elif ratio < 1 - tolerance:
+                print(f"  faster     {scene_name} / {case_name}: {old_ms:.2f}ms -> {ms:.2f}ms ({ratio:.2f}x)")
+    if ok:
+        print("  No regressions")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scenes', nargs='+', choices=list(CORPUS), help='Scenes to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, best is reported')
+    parser.add_argument('--save', help='Write timings to this JSON file')
+    parser.add_argument('--compare', help='Compare against timings saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown for --compare')
+    parser.add_argument('--stages', action='store_true', help='Also print mean ms per engine stage')
+    args = parser.parse_args()
+
+    results = run(args.scenes, args.repeat, args.stages)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved timings to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
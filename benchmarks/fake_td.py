@@ -0,0 +1,281 @@
+"""
+Minimal TouchDesigner stand-in for timing the parameter engine outside TD
+Covers what scripts/manual_triggers_fixed.py touches: op(), tableDAT cells,
+textDATs, COMP children, storage and create(), custom pages with appendFloat/appendRGB,
+and Par values, ranges and destroy()
+
+Behaves like TD where the engine depends on it: page.pars lists the r, g, b
+components of RGB parameters, and appending a name that already exists raises.
+"""
+
+CODE_MANAGER = '/project1/hydra_system/code/CodeManager'
+CONTROLLER = '/project1/hydra_system/direct_param_controller'
+
+
+class Cell:
+    __slots__ = ('val',)
+
+    def __init__(self, val):
+        self.val = val
+
+
+class Par:
+    """A single parameter value"""
+
+    def __init__(self, name, page, tuplet_name=None):
+        self.name = name
+        self.tupletName = tuplet_name or name
+        self.page = page
+        self.owner = page.owner
+        self._val = 0.0
+        self.normMin = 0.0
+        self.normMax = 1.0
+        self.clampMin = False
+        self.clampMax = False
+        self.label = name
+
+    @property
+    def val(self):
+        return self._val
+
+    @val.setter
+    def val(self, value):
+        self._val = float(value)
+        self.owner.par_writes += 1
+
+    def eval(self):
+        return self._val
+
+    def destroy(self):
+        self.page._destroy(self.tupletName)
+
+
+class ParGroup:
+    """An RGB parameter - three Pars named name+r/g/b"""
+
+    def __init__(self, name, page):
+        self.name = name
+        self.page = page
+        self.pars = [Par(name + channel, page, tuplet_name=name) for channel in 'rgb']
+
+    def __getitem__(self, index):
+        return self.pars[index]
+
+    def __len__(self):
+        return len(self.pars)
+
+    def destroy(self):
+        self.page._destroy(self.name)
+
+
+class Page:
+    def __init__(self, name, owner):
+        self.name = name
+        self.owner = owner
+        self._tuplets = {}   # tuplet name -> Par or ParGroup, in creation order
+        self._names = set()  # Every Par name, including RGB components
+
+    @property
+    def pars(self):
+        pars = []
+        for tuplet in self._tuplets.values():
+            if isinstance(tuplet, ParGroup):
+                pars.extend(tuplet.pars)
+            else:
+                pars.append(tuplet)
+        return pars
+
+    def _check_name(self, name):
+        if name in self._names or name in self._tuplets:
+            raise Exception(f"Parameter name '{name}' already exists")
+
+    def appendFloat(self, name, label=None):
+        self._check_name(name)
+        par = Par(name, self)
+        self._tuplets[name] = par
+        self._names.add(name)
+        return par
+
+    def appendRGB(self, name, label=None):
+        self._check_name(name)
+        for channel in 'rgb':
+            self._check_name(name + channel)
+        group = ParGroup(name, self)
+        self._tuplets[name] = group
+        self._names.update(par.name for par in group.pars)
+        return group
+
+    def _destroy(self, tuplet_name):
+        if tuplet_name not in self._tuplets:
+            raise Exception(f"Parameter '{tuplet_name}' was already destroyed")
+        tuplet = self._tuplets.pop(tuplet_name)
+        if isinstance(tuplet, ParGroup):
+            self._names.difference_update(par.name for par in tuplet.pars)
+        else:
+            self._names.discard(tuplet.name)
+
+
+class ParNamespace:
+    """op.par - attribute access to parameters; empty unless set"""
+
+
+class OP:
+    OPType = 'baseCOMP'
+
+    def __init__(self, network, path):
+        self.network = network
+        self.path = path
+        self.name = path.rsplit('/', 1)[-1]
+        self.tags = set()
+        self.inputs = []
+        self.par = ParNamespace()
+        self.valid = True
+
+    def parent(self):
+        return self.network.op(self.path.rsplit('/', 1)[0])
+
+    def destroy(self):
+        prefix = self.path + '/'
+        for path in [p for p in self.network.ops if p == self.path or p.startswith(prefix)]:
+            self.network.ops.pop(path).valid = False
+
+
+class COMP(OP):
+    def __init__(self, network, path):
+        super().__init__(network, path)
+        self.customPages = []
+        self.par_writes = 0
+        self.storage = {}
+
+    @property
+    def children(self):
+        prefix = self.path + '/'
+        return [o for path, o in self.network.ops.items()
+                if path.startswith(prefix) and '/' not in path[len(prefix):]]
+
+    def store(self, key, value):
+        self.storage[key] = value
+        return value
+
+    def fetch(self, key, default=None, search=True):
+        return self.storage.get(key, default)
+
+    def op(self, name):
+        return self.network.op(f'{self.path}/{name}')
+
+    def create(self, op_type, name):
+        return self.network.add(op_type(self.network, f'{self.path}/{name}'))
+
+    def appendCustomPage(self, name):
+        page = Page(name, self)
+        self.customPages.append(page)
+        return page
+
+
+class TextDAT(OP):
+    OPType = 'textDAT'
+
+    def __init__(self, network, path, text=''):
+        super().__init__(network, path)
+        self._text = text
+        self.writes = 0
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self.writes += 1
+
+
+class TableDAT(OP):
+    OPType = 'tableDAT'
+
+    def __init__(self, network, path, rows):
+        super().__init__(network, path)
+        self.rows = [list(row) for row in rows]
+
+    @property
+    def numRows(self):
+        return len(self.rows)
+
+    @property
+    def numCols(self):
+        return len(self.rows[0]) if self.rows else 0
+
+    def __getitem__(self, cell):
+        row, col = cell
+        return Cell(self.rows[row][col])
+
+
+class Network:
+    """A fake /project1 holding the scene DATs, registry and parameter controller"""
+
+    def __init__(self):
+        self.ops = {}
+
+    def add(self, o):
+        self.ops[o.path] = o
+        return o
+
+    def op(self, path):
+        return self.ops.get(path)
+
+    @property
+    def controller(self):
+        return self.ops[CONTROLLER]
+
+    def scene(self, number):
+        return self.ops[f'{CODE_MANAGER}/scene{number}_code']
+
+    def set_active_scene(self, number):
+        registry = self.ops[f'{CODE_MANAGER}/scene_registry']
+        for row in registry.rows[1:]:
+            row[1] = '1' if row[2] == f'scene{number}_code' else '0'
+
+    def param_page(self):
+        for page in self.controller.customPages:
+            if page.name == 'HydraParams':
+                return page
+        return None
+
+
+def build_network(scenes):
+    """
+    Build the network the parameter engine expects.
+
+    Args:
+        scenes: Scene code strings - scene1_code, scene2_code, ...; the first is active
+    """
+    network = Network()
+    network.add(COMP(network, '/project1'))
+    network.add(COMP(network, CODE_MANAGER))
+    rows = [['name', 'active', 'dat_name']]
+    for number, code in enumerate(scenes, start=1):
+        dat = network.add(TextDAT(network, f'{CODE_MANAGER}/scene{number}_code', code))
+        dat.tags.add('SceneCode')
+        rows.append([f'Scene {number}', '1' if number == 1 else '0', f'scene{number}_code'])
+    network.add(TableDAT(network, f'{CODE_MANAGER}/scene_registry', rows))
+    network.add(COMP(network, CONTROLLER))
+    return network
+
+
+def install(module, network):
+    """Point a loaded module's TD globals (op, run, baseCOMP, parameterexecuteDAT) at the fake network"""
+    def fake_op(path):
+        return network.op(path)
+    fake_op.TDResources = None
+
+    def fake_run(func, *args, **kwargs):
+        # No frame loop - delayed calls run immediately
+        for key in ('delayFrames', 'delayMilliSeconds', 'delayRef'):
+            kwargs.pop(key, None)
+        return func(*args, **kwargs)
+
+    module.op = fake_op
+    module.run = fake_run
+    module.baseCOMP = COMP
+    module.parameterexecuteDAT = TextDAT
+    return module
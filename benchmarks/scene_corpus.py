@@ -0,0 +1,72 @@
+"""
+Generated Hydra scenes for the parameter engine benchmarks
+Deterministic for a given seed, so timings compare across runs
+"""
+
+import random
+
+SOURCES = ['osc({}, {}, {})', 'noise({}, {})', 'voronoi({}, {}, {})', 'shape({}, {}, {})',
+           'gradient({})', 'solid({}, {}, {})']
+CHAINED = ['.rotate({}, {})', '.scale({})', '.kaleid({})', '.pixelate({}, {})', '.repeat({}, {})',
+           '.modulate(noise({}), {})', '.modulateScale(osc({}), {})', '.brightness({})',
+           '.contrast({})', '.saturate({})', '.blend(o{}, {})', '.posterize({}, {})']
+COLOR = '.color({}, {}, {})'
+
+
+def _literal(rng):
+    return str(round(rng.uniform(-2, 60) if rng.random() < 0.3 else rng.random() * 4, rng.choice([0, 1, 2, 3])))
+
+
+def generate_scene(num_literals, chain_depth=8, color_every=4, seed=1):
+    """
+    Build a scene with about num_literals parameter literals.
+
+    Args:
+        num_literals: Target number of numeric literals
+        chain_depth: Chained calls per source
+        color_every: Every Nth chained call is a .color() RGB group (0 for none)
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    lines = []
+    count = 0
+    buffer = 0
+    while count < num_literals:
+        source = rng.choice(SOURCES)
+        lines.append(source.format(*(_literal(rng) for _ in range(source.count('{}')))))
+        count += source.count('{}')
+        for depth in range(1, chain_depth + 1):
+            if color_every and depth % color_every == 0:
+                call = COLOR
+            else:
+                call = rng.choice(CHAINED)
+            if call.startswith('.blend'):
+                lines.append('  ' + call.format(rng.randint(0, 3), _literal(rng)))
+                count += 1
+            else:
+                lines.append('  ' + call.format(*(_literal(rng) for _ in range(call.count('{}')))))
+                count += call.count('{}')
+            if count >= num_literals:
+                break
+        lines.append(f'  .out(o{buffer})')
+        lines.append('')
+        buffer = (buffer + 1) % 4
+    return '\n'.join(lines)
+
+
+# name -> (literals, chain_depth, color_every)
+CORPUS = {
+    'tiny': (10, 4, 0),
+    'small': (100, 8, 4),
+    'medium': (1000, 8, 4),
+    'deep_chains': (1000, 60, 6),
+    'color_heavy': (1000, 12, 1),
+    'large': (10000, 12, 4),
+}
+
+
+def corpus(names=None, seed=1):
+    """Yield (name, code) for the named scenes (all by default)"""
+    for name in names or CORPUS:
+        literals, chain_depth, color_every = CORPUS[name]
+        yield name, generate_scene(literals, chain_depth, color_every, seed)
@@ -1,17 +1,10 @@
-# Read Hydra script
-with open('c:/Users/cuban/HydraToTD/html/hydra-synth.js', 'r', encoding='utf-8') as f:
-    hydra_script = f.read()
+# Build hydra_clean.html: src/hydra_final.html composed from fragments/, with hydra-synth.js inlined
+# Same as: python html/build_html.py clean (see build_html.py for --minify / --gzip / --hash)
+import os
+import sys
 
-# Read template
-with open('c:/Users/cuban/HydraToTD/html/hydra_final.html', 'r', encoding='utf-8') as f:
-    template = f.read()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from build_html import build_named
 
-# Insert Hydra script
-html = template.replace('HYDRA_SCRIPT_PLACEHOLDER', hydra_script)
-
-# Write final version
-with open('c:/Users/cuban/HydraToTD/html/hydra_clean.html', 'w', encoding='utf-8') as f:
-    f.write(html)
-
-print(f"Created clean HTML: {len(html)} bytes")
+build_named('clean')
 print("No test patterns - ready for CodeManager control")
@@ -0,0 +1,431 @@
+"""
+Build the Hydra HTML pages for the Web Render TOPs
+Composes each page in src/ from the shared fragments/ and, for the
+self-contained pages, streams the hydra-synth.js bundle into it
+
+A line of the form
+
+    //@include td_bridge.js
+
+in a page (or a fragment) is replaced by that fragment, indented to match the
+line. The TD bridge, CHOP accessors, performance monitor, debug overlay and
+helper functions each live in one fragment - edit the fragment, not the built
+pages.
+
+Every path is relative to this folder unless given on the command line.
+
+    python html/build_html.py                      # all pages in BUILDS
+    python html/build_html.py clean --minify --gzip
+    python html/build_html.py embedded --hash      # hydra_embedded.<hash>.html
+    python html/build_html.py --template my.html --placeholder SCRIPT --output my_built.html
+
+.build_manifest.json records the content hash of every input (page, fragments,
+bundle) and of the output of each build. A page whose inputs and options are
+unchanged since the last build is skipped without being composed; --force
+rebuilds anyway. A rebuilt page is only rewritten when its content changed, so
+a Web Render TOP watching the file doesn't reload for an edit that doesn't
+reach it. With --hash the page is written as name.<hash>.html instead; point
+the TOP's url at the printed path and it reloads exactly when the page changed.
+
+--brotli needs the 'brotli' package (pip install brotli); without it the
+.br file is skipped with a warning.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HTML_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = 'src'
+FRAGMENT_DIR = 'fragments'
+SCRIPT = 'hydra-synth.js'
+MANIFEST = '.build_manifest.json'
+
+# name -> (page in src/, bundle placeholder or None, output in the html folder)
+# Pages without a placeholder load hydra-synth.js with a <script src> themselves
+BUILDS = {
+    'template': ('hydra_template.html', None, 'hydra_template.html'),
+    'debug': ('hydra_template_debug.html', None, 'hydra_template_debug.html'),
+    'local': ('hydra_template_local.html', None, 'hydra_template_local.html'),
+    'clean': ('hydra_final.html', 'HYDRA_SCRIPT_PLACEHOLDER', 'hydra_clean.html'),
+    'embedded': ('hydra_embedded.html', 'HYDRA_CODE_HERE', 'hydra_embedded.html'),
+}
+
+INCLUDE_PATTERN = re.compile(r'^([ \t]*)//@include[ \t]+(\S+)[ \t]*$', re.MULTILINE)
+
+CHUNK_SIZE = 64 * 1024
+HASH_LENGTH = 10
+
+
+def _opens_template(line, inside):
+    """True if a `...` template literal is still open at the end of line"""
+    escaped = False
+    for ch in line:
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '`':
+            inside = not inside
+    return inside
+
+
+def minify_lines(lines):
+    """
+    Whitespace-only minification, safe for the bundle and inline scripts:
+    strips indentation and trailing space, drops blank lines and whole-line
+    // comments. Line breaks are kept, so automatic semicolon insertion is
+    unaffected.
+
+    Lines inside multi-line `...` template literals are kept as they are -
+    their whitespace and // text are part of the string. Backticks are
+    tracked per line without parsing quotes, comments or regexes, so a
+    backtick inside a '...' string or a regex literal would confuse it.
+    """
+    inside = False
+    for line in lines:
+        if inside:
+            inside = _opens_template(line, inside)
+            yield line
+            continue
+        stripped = line.strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        inside = _opens_template(stripped, inside)
+        # Trailing space after an opening backtick belongs to the literal
+        yield (line.lstrip().rstrip('\r\n') if inside else stripped) + '\n'
+
+
+class _Sink:
+    """Writes a page to a temp file while hashing and compressing it in the same pass"""
+
+    def __init__(self, path, use_gzip=False, use_brotli=False):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.file = None
+        self.gzip_file = None
+        self.brotli_file = None
+        try:
+            self.file = open(self.tmp_path, 'wb')
+            if use_gzip:
+                self.gzip_file = gzip.GzipFile(self.tmp_path + '.gz', 'wb', compresslevel=9, mtime=0)
+            if use_brotli:
+                self.brotli_file = open(self.tmp_path + '.br', 'wb')
+                self.brotli = brotli.Compressor(quality=11)
+        except BaseException:
+            self.discard()
+            raise
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.file.write(data)
+        self.hash.update(data)
+        self.size += len(data)
+        if self.gzip_file:
+            self.gzip_file.write(data)
+        if self.brotli_file:
+            self.brotli_file.write(self.brotli.process(data))
+
+    def close(self):
+        self.file.close()
+        if self.gzip_file:
+            self.gzip_file.close()
+        if self.brotli_file:
+            self.brotli_file.write(self.brotli.finish())
+            self.brotli_file.close()
+        return self.hash.hexdigest()
+
+    def discard(self):
+        """Close and delete the temp files after a failed build"""
+        for handle in (self.file, self.gzip_file, self.brotli_file):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        for suffix in ('', '.gz', '.br'):
+            if os.path.exists(self.tmp_path + suffix):
+                os.remove(self.tmp_path + suffix)
+
+    def compressed_paths(self):
+        """(temp path, suffix) of each compressed copy"""
+        paths = []
+        if self.gzip_file:
+            paths.append((self.tmp_path + '.gz', '.gz'))
+        if self.brotli_file:
+            paths.append((self.tmp_path + '.br', '.br'))
+        return paths
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compose(template_path, fragment_dir, inputs=None, _stack=()):
+    """
+    Resolve the //@include lines of a page or fragment.
+
+    Args:
+        template_path: Page to compose
+        fragment_dir: Folder the include names are relative to
+        inputs: Dict filled with path -> content hash of every file read
+        _stack: Files being composed, to catch include cycles
+
+    Returns:
+        Composed text
+    """
+    path = os.path.abspath(template_path)
+    if path in _stack:
+        chain = ' -> '.join(os.path.basename(p) for p in _stack + (path,))
+        raise ValueError(f"Include cycle: {chain}")
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    if inputs is not None:
+        inputs[path] = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def include(match):
+        indent, name = match.groups()
+        fragment_path = os.path.join(fragment_dir, name)
+        if not os.path.exists(fragment_path):
+            raise ValueError(f"{os.path.basename(path)}: fragment {name} not found in {fragment_dir}")
+        fragment = compose(fragment_path, fragment_dir, inputs, _stack + (path,))
+        # Indent every non-blank line; the include line's own line break follows the last one
+        lines = fragment.rstrip('\n').split('\n')
+        return '\n'.join(indent + line if line.strip() else '' for line in lines)
+
+    return INCLUDE_PATTERN.sub(include, text)
+
+
+def load_manifest(root=HTML_DIR):
+    """Output path -> manifest entry for the last builds in root ({} if none yet)"""
+    try:
+        with open(os.path.join(root, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, root=HTML_DIR):
+    path = os.path.join(root, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(path + '.tmp', path)
+
+
+def _is_current(entry, options, root):
+    """True if the entry's inputs, options and output all still match"""
+    if not entry or entry.get('options') != options:
+        return False
+    for rel_path, digest in entry['inputs'].items():
+        path = os.path.join(root, rel_path)
+        if not os.path.exists(path) or _file_hash(path) != digest:
+            return False
+    output_path = os.path.join(root, entry['output'])
+    return os.path.exists(output_path) and _file_hash(output_path) == entry['hash']
+
+
+def _stream_script(script_path, sink, minify):
+    with open(script_path, 'r', encoding='utf-8', newline='') as f:
+        if minify:
+            for line in minify_lines(f):
+                sink.write(line)
+        else:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+                sink.write(chunk)
+
+
+def _remove_stale_hashed(output_path, keep):
+    """Delete earlier name.<hash>.html pages (and their compressed copies)"""
+    folder, name = os.path.split(output_path)
+    stem, ext = os.path.splitext(name)
+    for entry in os.listdir(folder or '.'):
+        base = entry
+        for suffix in ('.gz', '.br'):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        middle = base[len(stem) + 1:-len(ext)] if base.startswith(stem + '.') and base.endswith(ext) else ''
+        if len(middle) == HASH_LENGTH and all(c in '0123456789abcdef' for c in middle) and base != keep:
+            os.remove(os.path.join(folder, entry))
+
+
+def build(template_path, placeholder, output_path, script_path=None,
+          minify=False, use_gzip=False, use_brotli=False, hashed=False,
+          fragment_dir=None, manifest=None, root=HTML_DIR, force=False):
+    """
+    Build one page.
+
+    Args:
+        template_path: HTML page, with //@include lines and the bundle placeholder
+        placeholder: Text replaced by the bundle (first occurrence), or None to inline nothing
+        output_path: Page to write (name.<hash>.html next to it with hashed)
+        script_path: Bundle to inline (default hydra-synth.js in this folder)
+        minify: Whitespace-minify page and bundle
+        use_gzip / use_brotli: Also write .gz / .br copies for servers that send them precompressed
+        hashed: Name the output by its content hash
+        fragment_dir: Folder of the included fragments (default fragments/ in this folder)
+        manifest: Manifest dict to check and update (see load_manifest) - None always builds
+        root: Folder the manifest paths are relative to
+        force: Build even if the manifest says the output is current
+
+    Returns:
+        (path written or kept, changed)
+    """
+    script_path = script_path or os.path.join(HTML_DIR, SCRIPT)
+    fragment_dir = fragment_dir or os.path.join(HTML_DIR, FRAGMENT_DIR)
+    if use_brotli and brotli is None:
+        print("Warning: brotli not installed - skipping .br (pip install brotli)")
+        use_brotli = False
+
+    options = dict(placeholder=placeholder, minify=minify, gzip=use_gzip, brotli=use_brotli, hashed=hashed)
+    key = os.path.relpath(output_path, root).replace(os.sep, '/')
+    if manifest is not None and not force and _is_current(manifest.get(key), options, root):
+        final_path = os.path.join(root, manifest[key]['output'])
+        print(f"Up to date: {final_path}")
+        return final_path, False
+
+    inputs = {}
+    template = compose(template_path, fragment_dir, inputs)
+    if placeholder is None:
+        head, tail = template, ''
+    elif placeholder not in template:
+        raise ValueError(f"Placeholder {placeholder} not found in {template_path}")
+    else:
+        head, tail = template.split(placeholder, 1)
+        inputs[os.path.abspath(script_path)] = _file_hash(script_path)
+    if minify:
+        head = ''.join(minify_lines(head.splitlines(keepends=True)))
+        tail = ''.join(minify_lines(tail.splitlines(keepends=True)))
+        if placeholder is not None:
+            # minify_lines ends each line - keep <script> and the bundle on the placeholder's line
+            head = head[:-1] if head.endswith('\n') else head
+
+    sink = _Sink(output_path, use_gzip, use_brotli)
+    try:
+        sink.write(head)
+        if placeholder is not None:
+            _stream_script(script_path, sink, minify)
+        sink.write(tail)
+        digest = sink.close()
+    except BaseException:
+        sink.discard()
+        raise
+
+    if hashed:
+        stem, ext = os.path.splitext(output_path)
+        final_path = f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+    else:
+        final_path = output_path
+
+    changed = not (os.path.exists(final_path) and _file_hash(final_path) == digest)
+    if changed:
+        os.replace(sink.tmp_path, final_path)
+        for tmp_path, suffix in sink.compressed_paths():
+            os.replace(tmp_path, final_path + suffix)
+    else:
+        # Identical page already there - leave it (and its mtime) alone
+        os.remove(sink.tmp_path)
+        for tmp_path, suffix in sink.compressed_paths():
+            if os.path.exists(final_path + suffix):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path + suffix)
+
+    if hashed:
+        _remove_stale_hashed(output_path, os.path.basename(final_path))
+
+    if manifest is not None:
+        def rel(path):
+            return os.path.relpath(path, root).replace(os.sep, '/')
+        manifest[key] = {
+            'inputs': {rel(path): input_hash for path, input_hash in sorted(inputs.items())},
+            'options': options,
+            'output': rel(final_path),
+            'hash': digest,
+        }
+
+    status = 'Built' if changed else 'Unchanged'
+    print(f"{status}: {final_path} ({sink.size} bytes)")
+    return final_path, changed
+
+
+def build_named(name, root=HTML_DIR, script_path=None, manifest=None, **options):
+    """
+    Build one of BUILDS, paths relative to root.
+    Loads and saves root's manifest unless one is passed in (the caller saves it then).
+    """
+    template, placeholder, output = BUILDS[name]
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = load_manifest(root)
+    result = build(os.path.join(root, SOURCE_DIR, template), placeholder, os.path.join(root, output),
+                   script_path=script_path or os.path.join(root, SCRIPT),
+                   fragment_dir=os.path.join(root, FRAGMENT_DIR), manifest=manifest, root=root, **options)
+    if own_manifest:
+        save_manifest(manifest, root)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('builds', nargs='*', help=f"Pages to build: {', '.join(BUILDS)} (default: all)")
+    parser.add_argument('--root', default=HTML_DIR, help='Folder holding templates, bundle and outputs')
+    parser.add_argument('--template', help='Custom page (with --output, and --placeholder to inline the bundle)')
+    parser.add_argument('--placeholder', help='Text in --template replaced by the bundle')
+    parser.add_argument('--output', help='Output for --template')
+    parser.add_argument('--script', help='Bundle to inline (default: hydra-synth.js in --root)')
+    parser.add_argument('--minify', action='store_true', help='Strip indentation, blank lines and // comment lines')
+    parser.add_argument('--gzip', action='store_true', help='Also write a .gz copy')
+    parser.add_argument('--brotli', action='store_true', help='Also write a .br copy (needs brotli)')
+    parser.add_argument('--hash', action='store_true', help='Write name.<hash>.html, removing older hashed pages')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the manifest says a page is current')
+    args = parser.parse_args()
+
+    options = dict(minify=args.minify, use_gzip=args.gzip, use_brotli=args.brotli,
+                   hashed=args.hash, force=args.force)
+    manifest = load_manifest(args.root)
+
+    if args.template:
+        if not args.output:
+            parser.error('--template needs --output')
+        try:
+            build(args.template, args.placeholder, args.output,
+                  script_path=args.script or os.path.join(args.root, SCRIPT),
+                  fragment_dir=os.path.join(args.root, FRAGMENT_DIR),
+                  manifest=manifest, root=args.root, **options)
+        finally:
+            save_manifest(manifest, args.root)
+        return
+
+    unknown = [name for name in args.builds if name not in BUILDS]
+    if unknown:
+        parser.error(f"Unknown build(s): {', '.join(unknown)} - choose from {', '.join(BUILDS)}")
+    try:
+        for name in args.builds or list(BUILDS):
+            build_named(name, args.root, args.script, manifest=manifest, **options)
+    finally:
+        # Keep the entries of the pages that did build if a later one fails
+        save_manifest(manifest, args.root)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,25 @@
+// CHOP accessor function for Hydra code
+// Returns a function that evaluates to the current CHOP value
+window.chop = function(name, index) {
+    return function() {
+        if (window.tdData.chops[name] && window.tdData.chops[name][index] !== undefined) {
+            return window.tdData.chops[name][index];
+        }
+        return 0;
+    };
+};
+
+// Shorthand LFO accessor
+window.lfo = function(index) {
+    return chop('lfo' + index, 0);
+};
+
+// MIDI accessor
+window.midi = function(cc) {
+    return chop('midi', cc);
+};
+
+// Audio FFT from TD analysis
+window.audioFFT = function(index) {
+    return chop('audio_spectrum', index);
+};
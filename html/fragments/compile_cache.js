@@ -0,0 +1,199 @@
+// Compiled scene cache - scene switches without a GL compile
+// Hydra inlines every number into the fragment shader, so any literal change is
+// a new program to compile and link. Here literal arguments of Hydra functions
+// become uniforms (osc(10, 0.1) -> osc(() => __L[0], () => __L[1])), so every
+// scene with the same structure shares one shader source and regl reuses the
+// linked program for it. Draw commands are still rebuilt from each eval's
+// passes, so arrow functions, tdParams lookups and sources stay live.
+// Re-running the scene already on the outputs with new values skips the eval -
+// only for scenes made of nothing but Hydra chains (see isCurrentScene).
+const COMPILE_CACHE_SIZE = 16;     // Scenes kept, least recently used dropped first
+const MAX_UNIFORM_LITERALS = 64;   // Literals past this stay inline - uniform limits
+
+window.tdCompileCache = {
+    size: COMPILE_CACHE_SIZE,
+    entries: new Map(),   // normalized code -> scene, oldest first
+    hits: 0,
+    misses: 0,
+    evicted: 0,
+    valueOnly: 0          // Applies that only changed values of the scene on the outputs
+};
+
+const SCENE_LITERAL = /-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?(?=\s*[,)])/y;
+const CHAIN_HEAD = /([A-Za-z_$][\w$]*)\s*\(/y;
+
+let currentScene = null;  // Scene last evaluated in full
+let outputRenders = 0;    // Output.render calls, to notice other code replacing a graph
+
+function isHydraFunction(name) {
+    return Object.prototype.hasOwnProperty.call(hydra.generator.glslTransforms, name);
+}
+
+// True if the '(' at index opens a call of a Hydra function - osc(, .rotate(
+function isHydraCall(code, index) {
+    let end = index;
+    while (end > 0 && /\s/.test(code[end - 1])) end--;
+    let start = end;
+    while (start > 0 && /[\w$]/.test(code[start - 1])) start--;
+    return start < end && isHydraFunction(code.slice(start, end));
+}
+
+// True if a statement starting at index is a Hydra chain - osc(10).out(o1)
+function startsHydraChain(code, index) {
+    CHAIN_HEAD.lastIndex = index;
+    const match = CHAIN_HEAD.exec(code);
+    return match !== null && isHydraFunction(match[1]);
+}
+
+// True if the line break at index continues a chain - a '.' starts the next line
+function continuesChain(code, index) {
+    let i = index + 1;
+    while (i < code.length && /\s/.test(code[i])) i++;
+    return code[i] === '.';
+}
+
+function skipQuoted(code, index) {
+    const quote = code[index];
+    let i = index + 1;
+    while (i < code.length && code[i] !== quote) {
+        i += code[i] === '\\' ? 2 : 1;
+    }
+    return i + 1;
+}
+
+// {code, values, chainsOnly} - code with literal Hydra arguments replaced by
+// () => __L[i]; chainsOnly if every statement is a Hydra chain
+function normalizeScene(code) {
+    const parts = [];
+    const values = [];
+    const calls = [];     // Per open bracket: true for a Hydra call's argument list
+    let argStart = false;
+    let statementStart = true;
+    let chainsOnly = true;
+    let copied = 0;
+    let i = 0;
+    while (i < code.length) {
+        const ch = code[i];
+        if (ch === '/' && code[i + 1] === '/') {
+            const end = code.indexOf('\n', i);
+            i = end < 0 ? code.length : end;
+            continue;
+        } else if (ch === '/' && code[i + 1] === '*') {
+            const end = code.indexOf('*/', i + 2);
+            i = end < 0 ? code.length : end + 2;
+            continue;
+        } else if (/\s/.test(ch)) {
+            if (ch === '\n' && !calls.length && !continuesChain(code, i)) statementStart = true;
+            i++;
+            continue;
+        }
+        if (statementStart) {
+            // speed = 2, s0.initCam(), setResolution(...) - side effects a value-only apply would skip
+            if (ch !== ';' && !startsHydraChain(code, i)) chainsOnly = false;
+            statementStart = false;
+        }
+        if (ch === '"' || ch === "'" || ch === '`') {
+            i = skipQuoted(code, i);
+            argStart = false;
+        } else if (ch === ';') {
+            statementStart = !calls.length;
+            argStart = false;
+            i++;
+        } else if (ch === '(') {
+            calls.push(isHydraCall(code, i));
+            argStart = true;
+            i++;
+        } else if (ch === '[' || ch === '{') {
+            calls.push(false);
+            argStart = false;
+            i++;
+        } else if (ch === ')' || ch === ']' || ch === '}') {
+            calls.pop();
+            argStart = false;
+            i++;
+        } else if (ch === ',') {
+            argStart = true;
+            i++;
+        } else {
+            if (argStart && calls[calls.length - 1] && values.length < MAX_UNIFORM_LITERALS) {
+                SCENE_LITERAL.lastIndex = i;
+                const match = SCENE_LITERAL.exec(code);
+                if (match) {
+                    parts.push(code.slice(copied, i), '() => __L[' + values.length + ']');
+                    values.push(parseFloat(match[0]));
+                    i += match[0].length;
+                    copied = i;
+                    argStart = false;
+                    continue;
+                }
+            }
+            argStart = false;
+            i++;
+        }
+    }
+    parts.push(code.slice(copied));
+    return { code: parts.join(''), values: values, chainsOnly: chainsOnly };
+}
+
+// Cached scene for code, its values set from code's literals
+function prepareScene(code) {
+    const cache = window.tdCompileCache;
+    const normalized = normalizeScene(code);
+    let scene = cache.entries.get(normalized.code);
+    if (scene) {
+        cache.entries.delete(normalized.code);
+        for (let i = 0; i < normalized.values.length; i++) {
+            scene.values[i] = normalized.values[i];
+        }
+        cache.hits++;
+    } else {
+        scene = { code: normalized.code, values: normalized.values, chainsOnly: normalized.chainsOnly, renders: -1 };
+        cache.misses++;
+    }
+    cache.entries.set(normalized.code, scene);
+    while (cache.entries.size > Math.max(cache.size, 1)) {
+        const oldest = cache.entries.keys().next().value;
+        if (currentScene && oldest === currentScene.code) currentScene = null;
+        cache.entries.delete(oldest);
+        cache.evicted++;
+    }
+    return scene;
+}
+
+// True if scene is what the outputs show now - only its values need to change.
+// Scenes with other statements (speed = 2, s0.initCam(), setResolution) always
+// run in full, as do scenes after any other code rendered to an output
+function isCurrentScene(scene) {
+    return scene.chainsOnly && scene === currentScene && scene.renders === outputRenders;
+}
+
+// Count output renders, to notice other code replacing a graph
+const outputPrototype = Object.getPrototypeOf(hydra.o[0]);
+const hydraOutputRender = outputPrototype.render;
+outputPrototype.render = function(passes) {
+    outputRenders++;
+    hydraOutputRender.call(this, passes);
+};
+
+// Cache counters as JSON (called from TD)
+window.getCompileCacheStats = function() {
+    const cache = window.tdCompileCache;
+    return JSON.stringify({
+        size: cache.size,
+        scenes: cache.entries.size,
+        hits: cache.hits,
+        misses: cache.misses,
+        evicted: cache.evicted,
+        valueOnly: cache.valueOnly
+    });
+};
+
+// Drop every cached scene; 0 turns caching off (called from TD)
+window.setCompileCacheSize = function(size) {
+    const cache = window.tdCompileCache;
+    cache.size = Math.max(0, size | 0);
+    if (cache.size === 0) {
+        cache.entries.clear();
+        currentScene = null;
+    }
+};
@@ -0,0 +1,16 @@
+// Debug logging - console, plus the #debug overlay on pages that have one
+function log(msg) {
+    console.log(msg);
+    const debug = document.getElementById('debug');
+    if (debug) {
+        debug.innerHTML += '<br>' + msg;
+    }
+}
+
+// Hide the overlay once the page is known to work
+function hideDebug(delay) {
+    setTimeout(() => {
+        const debug = document.getElementById('debug');
+        if (debug) debug.style.display = 'none';
+    }, delay);
+}
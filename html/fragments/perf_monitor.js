@@ -0,0 +1,148 @@
+// Performance monitoring
+window.tdPerformance = {
+    fps: 60,
+    frameTime: 0,
+    lastUpdate: Date.now(),
+    chopUpdateRate: 0,
+    chopLatency: 0
+};
+
+let frameCount = 0;
+let lastTime = performance.now();
+let lastChopUpdate = Date.now();
+
+// Duration of each of the last FRAME_RING_SIZE frames in ms (performance.now),
+// frame n at frameRing[n % FRAME_RING_SIZE] - read by the telemetry sampler
+const FRAME_RING_SIZE = 256;
+const frameRing = new Float32Array(FRAME_RING_SIZE);
+let framesRecorded = 0;
+let lastFrameStart = performance.now();
+
+// Frame-time histogram since the last resetFrameStats(): HISTOGRAM_BUCKET_MS
+// wide buckets, the last one collecting everything slower
+const HISTOGRAM_BUCKET_MS = 0.5;
+const HISTOGRAM_BUCKETS = 200;
+const JANK_LOG_SIZE = 32;
+const frameHistogram = new Uint32Array(HISTOGRAM_BUCKETS);
+
+window.tdFrameStats = {
+    budgetMs: 1000 / 60,
+    jankFactor: 1.5,      // A frame is over budget past budgetMs * jankFactor - a missed vsync
+    frames: 0,
+    overBudget: 0,
+    maxMs: 0,
+    since: Date.now(),
+    jank: []              // Last JANK_LOG_SIZE over-budget frames, with what ran during them
+};
+
+// What ran since the last frame - code applies and CHOP updates are the usual
+// suspects when a frame runs long
+let frameEvents = [];
+
+function noteFrameEvent(kind, detail) {
+    if (frameEvents.length < 16) frameEvents.push(detail ? kind + ':' + detail : kind);
+}
+
+function recordFrame(frameMs) {
+    const stats = window.tdFrameStats;
+    frameHistogram[Math.min(HISTOGRAM_BUCKETS - 1, Math.floor(frameMs / HISTOGRAM_BUCKET_MS))]++;
+    stats.frames++;
+    if (frameMs > stats.maxMs) stats.maxMs = frameMs;
+    if (frameMs > stats.budgetMs * stats.jankFactor) {
+        stats.overBudget++;
+        stats.jank.push({ t: Date.now(), ms: frameMs, after: frameEvents.length ? frameEvents.slice() : ['none'] });
+        if (stats.jank.length > JANK_LOG_SIZE) stats.jank.shift();
+    }
+    if (frameEvents.length) frameEvents = [];
+}
+
+function updatePerformance() {
+    const frameStart = performance.now();
+    const frameMs = frameStart - lastFrameStart;
+    frameRing[framesRecorded % FRAME_RING_SIZE] = frameMs;
+    framesRecorded++;
+    lastFrameStart = frameStart;
+    recordFrame(frameMs);
+
+    frameCount++;
+    const elapsed = frameStart - lastTime;
+
+    if (elapsed >= 1000) {
+        window.tdPerformance.fps = (frameCount / elapsed) * 1000;
+        window.tdPerformance.frameTime = elapsed / frameCount;
+        window.tdPerformance.lastUpdate = Date.now();
+        frameCount = 0;
+        lastTime = frameStart;
+    }
+
+    requestAnimationFrame(updatePerformance);
+}
+
+updatePerformance();
+
+// Upper edge of the bucket holding quantile q of the histogram
+function histogramPercentile(q) {
+    const total = window.tdFrameStats.frames;
+    if (total === 0) return 0;
+    const rank = Math.ceil(q * total);
+    let seen = 0;
+    for (let i = 0; i < HISTOGRAM_BUCKETS; i++) {
+        seen += frameHistogram[i];
+        if (seen >= rank) {
+            return i === HISTOGRAM_BUCKETS - 1 ? window.tdFrameStats.maxMs : (i + 1) * HISTOGRAM_BUCKET_MS;
+        }
+    }
+    return window.tdFrameStats.maxMs;
+}
+
+// Histogram summary as JSON (called from TD) - pass true for the bucket counts too
+window.getFrameStats = function(withHistogram) {
+    const stats = window.tdFrameStats;
+    const summary = {
+        frames: stats.frames,
+        seconds: (Date.now() - stats.since) / 1000,
+        budgetMs: stats.budgetMs,
+        p50: histogramPercentile(0.5),
+        p95: histogramPercentile(0.95),
+        p99: histogramPercentile(0.99),
+        maxMs: stats.maxMs,
+        overBudget: stats.overBudget,
+        jank: stats.jank
+    };
+    if (withHistogram) {
+        summary.bucketMs = HISTOGRAM_BUCKET_MS;
+        summary.histogram = Array.from(frameHistogram);
+    }
+    return JSON.stringify(summary);
+};
+
+// Start a new measurement - e.g. at the top of a set (called from TD)
+window.resetFrameStats = function() {
+    const stats = window.tdFrameStats;
+    frameHistogram.fill(0);
+    stats.frames = 0;
+    stats.overBudget = 0;
+    stats.maxMs = 0;
+    stats.since = Date.now();
+    stats.jank = [];
+};
+
+// Frame budget in ms - 1000 / the output's frame rate
+window.setFrameBudget = function(budgetMs) {
+    if (budgetMs > 0) window.tdFrameStats.budgetMs = budgetMs;
+};
+
+// Called by the TD bridge on every CHOP update - sentMs is TD's Date.now()-style
+// send time when the call carries one (same machine, so the clocks agree)
+function markChopUpdate(sentMs) {
+    const now = Date.now();
+    const chopElapsed = now - lastChopUpdate;
+    if (chopElapsed > 0) {
+        window.tdPerformance.chopUpdateRate = 1000 / chopElapsed;
+    }
+    if (sentMs) {
+        window.tdPerformance.chopLatency = Math.max(0, now - sentMs);
+    }
+    lastChopUpdate = now;
+    noteFrameEvent('chop');
+}
@@ -0,0 +1,102 @@
+// Global data store for TouchDesigner data
+window.tdData = {
+    chops: {},
+    timestamp: Date.now(),
+    updateCount: 0
+};
+
+// Live parameter values pushed by TD (uniform-injection mode)
+window.tdParams = [];
+
+// Update function called from TouchDesigner
+window.updateFromTD = function(jsonData, sentMs) {
+    try {
+        const data = JSON.parse(jsonData);
+        // Live parameter values - update params, leave CHOP data untouched
+        if (data.__params) {
+            window.tdParams = data.__params;
+            delete data.__params;
+            if (Object.keys(data).length === 0) return;
+        }
+
+        // Merge - each CHOP is a full list, {index: value} changes, or null when dropped
+        const chops = window.tdData.chops;
+        for (const name in data) {
+            const values = data[name];
+            if (values === null) {
+                delete chops[name];
+            } else if (Array.isArray(values) || !chops[name]) {
+                chops[name] = values;
+            } else {
+                for (const index in values) {
+                    chops[name][index] = values[index];
+                }
+            }
+        }
+        window.tdData.timestamp = Date.now();
+        window.tdData.updateCount++;
+        markChopUpdate(sentMs);
+    } catch(e) {
+        console.error('Parse error:', e);
+    }
+};
+
+// Packed CHOP transport - layout sent once, then Float32 values as base64
+// window.tdData.chops[name] become views into one preallocated buffer
+window.tdChopLayout = { version: -1, bytes: new Uint8Array(0) };
+
+window.setChopLayout = function(layoutJson) {
+    try {
+        const layout = JSON.parse(layoutJson);
+        if (layout.version === window.tdChopLayout.version) return;
+
+        const buffer = new Float32Array(layout.size);
+        const chops = {};
+        layout.chops.forEach(function(entry) {
+            // entry = [name, offset, length]
+            chops[entry[0]] = buffer.subarray(entry[1], entry[1] + entry[2]);
+        });
+        window.tdChopLayout = { version: layout.version, bytes: new Uint8Array(buffer.buffer) };
+        window.tdData.chops = chops;
+        noteFrameEvent('layout');
+    } catch(e) {
+        console.error('Layout error:', e);
+    }
+};
+
+window.updateFromTDPacked = function(version, packed, sentMs) {
+    const layout = window.tdChopLayout;
+    if (version !== layout.version) return;  // Layout not received yet - TD resends it
+
+    // Decode straight into the shared buffer - no JSON objects per update
+    const bin = atob(packed);
+    const bytes = layout.bytes;
+    const count = Math.min(bin.length, bytes.length);
+    for (let i = 0; i < count; i++) {
+        bytes[i] = bin.charCodeAt(i);
+    }
+
+    window.tdData.timestamp = Date.now();
+    window.tdData.updateCount++;
+    markChopUpdate(sentMs);
+};
+
+// Resolved CHOP slots - {{chop.channel}} templates compile to window.tdSlots[i]
+// reads (see scripts/chop_slots.py), so each per-frame access is one indexed read
+window.tdSlots = new Float32Array(64);
+let slotBytes = new Uint8Array(window.tdSlots.buffer);
+
+window.updateChopSlots = function(count, packed) {
+    if (count > window.tdSlots.length) {
+        // Grow in place of the old array - slot indices never change
+        const slots = new Float32Array(Math.max(count, window.tdSlots.length * 2));
+        slots.set(window.tdSlots);
+        window.tdSlots = slots;
+        slotBytes = new Uint8Array(slots.buffer);
+    }
+    const bin = atob(packed);
+    for (let i = 0; i < bin.length; i++) {
+        slotBytes[i] = bin.charCodeAt(i);
+    }
+    noteFrameEvent('slots');
+};
@@ -0,0 +1,80 @@
+// Execute Hydra code sent from TouchDesigner
+// Goes through the compiled scene cache (compile_cache.js) unless its size is 0
+window.runHydraCode = function(code) {
+    const cached = window.tdCompileCache.size > 0;
+    let scene = null;
+    let valueOnly = false;
+    try {
+        const start = performance.now();
+        if (!cached) {
+            eval(code);
+        } else {
+            scene = prepareScene(code);
+            if (isCurrentScene(scene)) {
+                // Same graph on the outputs - the new values are already in scene.values
+                window.tdCompileCache.valueOnly++;
+                valueOnly = true;
+            } else {
+                const __L = scene.values;
+                eval(scene.code);
+                scene.renders = outputRenders;
+                currentScene = scene;
+            }
+        }
+        noteCodeApply(performance.now() - start);
+        noteFrameEvent(valueOnly ? 'values' : 'apply', code.substring(0, 40).replace(/\s+/g, ' '));
+        log("Code executed: " + code.substring(0, 30) + "...");
+    } catch(e) {
+        if (scene) {
+            // Don't keep a half-run scene
+            window.tdCompileCache.entries.delete(scene.code);
+            currentScene = null;
+        }
+        console.error('Hydra execution error:', e);
+        console.error('Code:', code);
+        log("ERROR: " + e.message);
+    }
+};
+
+// Set which output buffer to render
+window.setOutput = function(index) {
+    try {
+        const buffer = eval('o' + index);
+        render(buffer);
+    } catch(e) {
+        console.error('Output error:', e);
+    }
+};
+
+// Get performance metrics (called from TD)
+window.getPerformance = function() {
+    return JSON.stringify(window.tdPerformance);
+};
+
+// Initialize video stream
+window.registerVideoStream = function(url) {
+    try {
+        s0.initStream(url);
+        log('Video stream initialized: ' + url);
+    } catch(e) {
+        console.error('Stream error:', e);
+    }
+};
+
+// Initialize webcam
+window.initWebcam = function() {
+    try {
+        s0.initCam();
+        log('Webcam initialized');
+    } catch(e) {
+        console.error('Webcam error:', e);
+    }
+};
+
+// Clear all outputs
+window.clearAll = function() {
+    solid(0).out(o0);
+    solid(0).out(o1);
+    solid(0).out(o2);
+    solid(0).out(o3);
+};
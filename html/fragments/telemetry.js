@@ -0,0 +1,148 @@
+// Telemetry pushed to TD - scripts/telemetry_collector.py behind a Web Server DAT
+// Every intervalMs one sample (fps, frame-time percentiles, code applies, CHOP
+// latency) goes into a ring buffer; open sockets are sent everything pending,
+// so samples taken while TD was unreachable arrive once it is back
+const TELEMETRY_RING_SIZE = 240;
+
+window.tdTelemetry = {
+    url: null,
+    source: '',
+    intervalMs: 250,
+    socket: null,
+    timer: null,
+    pending: [],       // Samples not sent yet, oldest first, at most TELEMETRY_RING_SIZE
+    sent: 0,
+    dropped: 0
+};
+
+let telemetryFrame = 0;   // framesRecorded when the last sample was taken
+let telemetryOverBudget = 0;  // tdFrameStats.overBudget then
+let codeApplies = [];     // Applies since the last sample
+
+// Called by runHydraCode - the frame after an apply carries the shader compile
+function noteCodeApply(evalMs) {
+    codeApplies.push({ t: Date.now(), evalMs: evalMs, frame: framesRecorded });
+}
+
+// Frame-time percentiles over the frames since the last sample (at most the ring)
+function frameStats(fromFrame) {
+    const count = Math.min(framesRecorded - fromFrame, FRAME_RING_SIZE);
+    if (count <= 0) return { frames: 0, p50: 0, p95: 0, p99: 0, max: 0 };
+    const times = new Float32Array(count);
+    for (let i = 0; i < count; i++) {
+        times[i] = frameRing[(framesRecorded - count + i) % FRAME_RING_SIZE];
+    }
+    times.sort();
+    const at = function(q) { return times[Math.min(count - 1, Math.floor(q * count))]; };
+    return { frames: count, p50: at(0.5), p95: at(0.95), p99: at(0.99), max: times[count - 1] };
+}
+
+function takeTelemetrySample() {
+    const stats = frameStats(telemetryFrame);
+    telemetryFrame = framesRecorded;
+
+    // Applies whose next frame hasn't run yet wait for the following sample
+    const ready = codeApplies.filter(function(a) { return a.frame < framesRecorded; });
+    codeApplies = codeApplies.filter(function(a) { return a.frame >= framesRecorded; });
+    let evalMs = 0, applyFrameMs = 0;
+    ready.forEach(function(a) {
+        evalMs = Math.max(evalMs, a.evalMs);
+        if (framesRecorded - a.frame <= FRAME_RING_SIZE) {
+            applyFrameMs = Math.max(applyFrameMs, frameRing[a.frame % FRAME_RING_SIZE]);
+        }
+    });
+
+    // resetFrameStats() zeroes the count in between - then everything since is new
+    const overBudget = window.tdFrameStats.overBudget;
+    const newOverBudget = overBudget >= telemetryOverBudget ? overBudget - telemetryOverBudget : overBudget;
+    telemetryOverBudget = overBudget;
+
+    const perf = window.tdPerformance;
+    const telemetry = window.tdTelemetry;
+    telemetry.pending.push({
+        t: Date.now(),
+        fps: perf.fps,
+        frames: stats.frames,
+        frame_p50: stats.p50,
+        frame_p95: stats.p95,
+        frame_p99: stats.p99,
+        frame_max: stats.max,
+        applies: ready.length,
+        apply_eval_ms: evalMs,
+        apply_frame_ms: applyFrameMs,
+        chop_rate: perf.chopUpdateRate,
+        chop_latency: perf.chopLatency,
+        over_budget: newOverBudget
+    });
+    if (telemetry.pending.length > TELEMETRY_RING_SIZE) {
+        telemetry.dropped += telemetry.pending.length - TELEMETRY_RING_SIZE;
+        telemetry.pending.splice(0, telemetry.pending.length - TELEMETRY_RING_SIZE);
+    }
+    flushTelemetry();
+}
+
+function flushTelemetry() {
+    const telemetry = window.tdTelemetry;
+    const socket = telemetry.socket;
+    if (!socket || socket.readyState !== WebSocket.OPEN || telemetry.pending.length === 0) return;
+    socket.send(JSON.stringify({ source: telemetry.source, samples: telemetry.pending }));
+    telemetry.sent += telemetry.pending.length;
+    telemetry.pending = [];
+}
+
+function connectTelemetry() {
+    const telemetry = window.tdTelemetry;
+    if (!telemetry.url) return;
+    try {
+        const socket = new WebSocket(telemetry.url);
+        socket.onopen = flushTelemetry;
+        socket.onclose = function() {
+            // Keep sampling into the ring and retry - TD may be saving or restarting the server
+            if (telemetry.socket === socket && telemetry.url) setTimeout(connectTelemetry, 2000);
+        };
+        telemetry.socket = socket;
+    } catch(e) {
+        console.error('Telemetry connect error:', e);
+    }
+}
+
+// Called from TD: startTelemetry('ws://127.0.0.1:9980', 250, 'o0')
+window.startTelemetry = function(url, intervalMs, source) {
+    window.stopTelemetry();
+    const telemetry = window.tdTelemetry;
+    telemetry.url = url;
+    telemetry.intervalMs = intervalMs || telemetry.intervalMs;
+    telemetry.source = source || '';
+    telemetryFrame = framesRecorded;
+    telemetryOverBudget = window.tdFrameStats.overBudget;
+    telemetry.timer = setInterval(takeTelemetrySample, telemetry.intervalMs);
+    connectTelemetry();
+};
+
+window.stopTelemetry = function() {
+    const telemetry = window.tdTelemetry;
+    telemetry.url = null;
+    if (telemetry.timer) clearInterval(telemetry.timer);
+    telemetry.timer = null;
+    if (telemetry.socket) {
+        const socket = telemetry.socket;
+        telemetry.socket = null;
+        socket.close();
+    }
+};
+
+// Push the frame-time histogram summary (see getFrameStats) to the collector
+window.sendFrameStats = function() {
+    const telemetry = window.tdTelemetry;
+    const socket = telemetry.socket;
+    if (!socket || socket.readyState !== WebSocket.OPEN) return false;
+    socket.send('{"source": ' + JSON.stringify(telemetry.source) + ', "frameStats": ' + window.getFrameStats() + '}');
+    return true;
+};
+
+// Pending samples as JSON, emptying the ring - for polling without a socket
+window.getTelemetry = function() {
+    const samples = window.tdTelemetry.pending;
+    window.tdTelemetry.pending = [];
+    return JSON.stringify({ source: window.tdTelemetry.source, samples: samples });
+};
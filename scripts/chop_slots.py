@@ -0,0 +1,266 @@
+"""
+Resolved CHOP slots for {{chop.channel}} templates
+Expands each template reference to a fixed index into window.tdSlots once, at
+scene-compile time, instead of injecting literal values on every update
+
+    osc({{lfo1}} * 20 + 10, 0.1)  ->  osc(() => (window.tdSlots[0] * 20 + 10), 0.1)
+
+Hydra evaluates the slot read per frame - one indexed read, no name lookups.
+push_slots() sends the current CHOP values as one packed Float32 array, so
+the scene compiles once and only the values change afterwards.
+
+Install in DataBridge as a textDAT named 'chop_slots', next to a copy of
+'hydra_code_parser'. No TouchDesigner dependencies beyond op() for reading CHOPs.
+"""
+
+import base64
+import bisect
+import re
+
+import numpy as np
+
+import hydra_code_parser
+
+# CHOP lookup order for {{name.channel}} (see CHOP_REFERENCE_SYSTEM.md)
+CHOP_SEARCH_PATHS = ['/project1/', '/project1/hydra_system/', '/']
+
+# {{mouse.x}} / {{mouse.y}} aliases
+REF_ALIASES = {
+    'mouse.x': ('mousein1', 'tx'),
+    'mouse.y': ('mousein1', 'ty')
+}
+
+# Values changing by no more than this are not re-sent
+SLOT_EPSILON = 1e-4
+
+# Includes references inside arrow functions, which the parser's tokens swallow
+_TEMPLATE_RE = re.compile(r'\{\{([^}]*)\}\}')
+
+# Hydra transforms - only their arguments may become arrow functions.
+# Arguments of other calls (Math.sin, Math.max, ...) must stay numbers
+HYDRA_FUNCTIONS = frozenset([
+    'noise', 'voronoi', 'osc', 'shape', 'gradient', 'src', 'solid', 'prev',
+    'rotate', 'scale', 'pixelate', 'repeat', 'repeatX', 'repeatY', 'kaleid',
+    'scroll', 'scrollX', 'scrollY',
+    'add', 'sub', 'layer', 'blend', 'mult', 'diff', 'mask',
+    'modulate', 'modulateRepeat', 'modulateRepeatX', 'modulateRepeatY',
+    'modulateKaleid', 'modulateScrollX', 'modulateScrollY', 'modulateScale',
+    'modulatePixelate', 'modulateRotate', 'modulateHue',
+    'posterize', 'shift', 'invert', 'contrast', 'brightness', 'luma', 'thresh',
+    'color', 'saturate', 'hue', 'colorama', 'sum', 'r', 'g', 'b', 'a'
+])
+
+
+def _is_hydra_call(callee):
+    """osc, .rotate - not Math.sin or a method of another object"""
+    qualifier, _, name = callee.rpartition('.')
+    return name in HYDRA_FUNCTIONS and not qualifier
+
+
+def parse_ref(ref):
+    """
+    Split a template reference into (chop_name, channel).
+
+    {{lfo1}} -> ('lfo1', 0), {{null1.2}} -> ('null1', 2),
+    {{transform1.tx}} -> ('transform1', 'tx'), {{mouse.x}} -> ('mousein1', 'tx')
+    """
+    ref = ref.strip()
+    if ref in REF_ALIASES:
+        return REF_ALIASES[ref]
+    name, _, channel = ref.partition('.')
+    if not channel:
+        return name, 0
+    return name, int(channel) if channel.isdigit() else channel
+
+
+class ChopSlotTable:
+    """
+    Stable slot per (chop_name, channel).
+
+    A reference keeps its slot for the life of the table, so scenes can be
+    switched and re-expanded without the page reallocating or remapping.
+    """
+
+    def __init__(self):
+        self.slots = {}       # (chop_name, channel) -> slot index
+        self.refs = []        # slot index -> (chop_name, channel)
+        self._chops = {}      # chop_name -> resolved CHOP
+        self._missing = set()
+        self.sent = None      # Values the page last received
+        self.skipped = 0
+
+    def slot(self, ref):
+        key = parse_ref(ref)
+        index = self.slots.get(key)
+        if index is None:
+            index = len(self.refs)
+            self.slots[key] = index
+            self.refs.append(key)
+        return index
+
+    def _resolve(self, chop_name):
+        """Find a CHOP by name (search order above), cached until it is deleted"""
+        chop = self._chops.get(chop_name)
+        if chop is not None and chop.valid:
+            return chop
+
+        for prefix in CHOP_SEARCH_PATHS:
+            chop = op(prefix + chop_name)
+            if chop is not None:
+                self._chops[chop_name] = chop
+                self._missing.discard(chop_name)
+                return chop
+
+        if chop_name not in self._missing:
+            print(f"⚠️  CHOP '{chop_name}' not found - its slots read 0")
+            self._missing.add(chop_name)
+        return None
+
+    def values(self):
+        """Current value of every slot as float32 (0 for missing CHOPs/channels)"""
+        values = np.zeros(len(self.refs), dtype='<f4')
+        for index, (chop_name, channel) in enumerate(self.refs):
+            chop = self._resolve(chop_name)
+            if chop is None:
+                continue
+            try:
+                values[index] = chop[channel].eval()
+            except Exception:
+                pass
+        return values
+
+    def packed(self, epsilon=SLOT_EPSILON):
+        """
+        JavaScript call that updates window.tdSlots, or None when nothing
+        moved by more than epsilon since the last call
+        """
+        values = self.values()
+        if (self.sent is not None and self.sent.size == values.size and
+                not np.any(np.abs(values - self.sent) > epsilon)):
+            self.skipped += 1
+            return None
+
+        self.sent = values
+        payload = base64.b64encode(values.tobytes()).decode('ascii')
+        return f"updateChopSlots({values.size}, '{payload}')"
+
+    def resend(self):
+        """Send all values with the next push (e.g. after reloading a page)"""
+        self.sent = None
+
+
+def expand_template(code_text, table):
+    """
+    Replace {{...}} references with slot reads.
+
+    The innermost Hydra transform argument holding a reference becomes an
+    arrow function, so the whole expression is re-evaluated per frame:
+    ({{mouse.x}} + 1) * 0.5 and Math.max({{lfo1}}, 2) stay correct. Arguments
+    of other calls stay numbers, references inside an arrow function only get
+    the slot read, and references outside any Hydra argument read the slot once.
+
+    Args:
+        code_text: Scene code with {{...}} templates
+        table: ChopSlotTable assigning the slots
+
+    Returns:
+        Expanded code
+    """
+    templates = list(_TEMPLATE_RE.finditer(code_text))
+    if not templates:
+        return code_text
+
+    # Arguments nest, so sweeping them in start order with a stack gives the
+    # arguments around each template, outermost first
+    spans = sorted(hydra_code_parser.argument_spans(code_text, calls=True), key=lambda s: (s[0], -s[1]))
+    arrows = [m.start() for m in re.finditer('=>', code_text)]
+
+    def has_arrow(start, end):
+        i = bisect.bisect_left(arrows, start)
+        return i < len(arrows) and arrows[i] < end - 1
+
+    # Innermost Hydra argument around each template, unless it sits in an arrow function already
+    wrapped = []
+    stack = []
+    next_span = 0
+    for match in templates:
+        while next_span < len(spans) and spans[next_span][0] <= match.start():
+            stack.append(spans[next_span])
+            next_span += 1
+        enclosing = [span for span in stack if match.end() <= span[1]]
+        stack = enclosing
+        if any(has_arrow(start, end) for start, end, callee in enclosing):
+            continue
+        for start, end, callee in reversed(enclosing):
+            if _is_hydra_call(callee):
+                wrapped.append((start, end))
+                break
+
+    # Keep only the outermost of these - inner ones are rewritten inside it
+    outer = []
+    for start, end in sorted(set(wrapped), key=lambda s: (s[0], -s[1])):
+        if not outer or end > outer[-1][1]:
+            outer.append((start, end))
+
+    template_starts = [match.start() for match in templates]
+
+    def substitute(start, end):
+        parts = []
+        pos = start
+        for match in templates[bisect.bisect_left(template_starts, start):]:
+            if match.end() > end:
+                break
+            parts.append(code_text[pos:match.start()])
+            parts.append(f"window.tdSlots[{table.slot(match.group(1))}]")
+            pos = match.end()
+        parts.append(code_text[pos:end])
+        return ''.join(parts)
+
+    replacements = [(start, end, f"() => ({substitute(start, end)})") for start, end in outer]
+
+    # References in arrow functions or outside any Hydra argument
+    outer_starts = [start for start, end in outer]
+    for match in templates:
+        i = bisect.bisect_right(outer_starts, match.start()) - 1
+        if i < 0 or outer[i][1] < match.end():
+            replacements.append((match.start(), match.end(), substitute(match.start(), match.end())))
+
+    replacements.sort()
+    return hydra_code_parser.splice(code_text, replacements)
+
+
+_table = ChopSlotTable()
+
+
+def expand_scene(code_text):
+    """Expand a scene with the shared slot table - call from code_generator before executing"""
+    return expand_template(code_text, _table)
+
+
+def push_slots(targets):
+    """
+    Send current slot values to each Web Render TOP - call from template_updater
+    in place of re-injecting the template.
+    """
+    call = _table.packed()
+    if call is None:
+        return
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            target.executeJavaScript(call)
+
+
+def get_slot_table():
+    """Slot assignments as {'lfo1.0': 0, ...} plus push statistics"""
+    return {
+        'slots': {f"{name}.{channel}": index for (name, channel), index in _table.slots.items()},
+        'skipped': _table.skipped
+    }
+
+
+def reset_slots():
+    """Forget all slot assignments - scenes must be expanded again"""
+    global _table
+    _table = ChopSlotTable()
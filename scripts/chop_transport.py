@@ -0,0 +1,279 @@
+"""
+Packed CHOP transport for the Hydra pages
+Sends CHOP samples as one Float32 buffer instead of a JSON object per update,
+and only when values moved by more than a per-CHOP epsilon
+
+The layout (CHOP name, offset, length) goes to the page once with
+setChopLayout(); each update is then a single base64 string that the page
+decodes into a preallocated Float32Array. window.tdData.chops[name] are views
+into that buffer, so chop()/lfo()/audioFFT() work unchanged.
+
+Install in DataBridge as a textDAT named 'chop_transport', then from the
+bridge's update callback:
+    op('chop_transport').module.send_chops(chops, targets)
+
+For the JSON transport, send_chop_deltas() sends only the channels that
+changed since the last update; updateFromTD merges them into tdData.chops.
+
+Both calls carry the send time in ms, which the page turns into the
+chop_latency telemetry channel (see telemetry_collector.py).
+
+Only needs NumPy - no TouchDesigner dependencies beyond the CHOPs passed in.
+"""
+
+import base64
+import json
+import time
+
+import numpy as np
+
+# Resend the layout every N packs so a reloaded page picks it up again
+LAYOUT_INTERVAL = 300
+
+# Changes at or below this are not sent - override per CHOP name with epsilons
+DEFAULT_EPSILON = 1e-4
+
+
+def sent_ms():
+    """Send time for the page, on the same clock as its Date.now()"""
+    return int(time.time() * 1000)
+
+
+def chop_samples(chop, dtype=np.float32):
+    """
+    Samples of a CHOP (or array) as a flat array, channel-major.
+
+    A 1-channel CHOP gives its samples (audio spectrum bins), a 1-sample CHOP
+    gives one value per channel (LFOs, MIDI) - the same indices the JSON
+    transport used.
+    """
+    if hasattr(chop, 'numpyArray'):
+        chop = chop.numpyArray()
+    return np.asarray(chop, dtype=dtype).ravel()
+
+
+def epsilons_from_mappings(chop_mappings):
+    """
+    Per-CHOP epsilons from a preset's chop_mappings - entries may carry an
+    optional "epsilon"; the CHOP name is the last part of "path".
+    """
+    epsilons = {}
+    for mapping in chop_mappings:
+        if 'epsilon' in mapping:
+            epsilons[mapping['path'].rsplit('/', 1)[-1]] = float(mapping['epsilon'])
+    return epsilons
+
+
+class ChopPacker:
+    """Packs named CHOP samples into a reused little-endian Float32 buffer"""
+
+    def __init__(self, layout_interval=LAYOUT_INTERVAL, epsilon=DEFAULT_EPSILON, epsilons=None):
+        self.layout_interval = layout_interval
+        self.epsilon = epsilon
+        self.epsilons = dict(epsilons or {})
+        self.version = 0
+        self.layout = ()      # ((name, offset, length), ...)
+        self.buffer = np.zeros(0, dtype='<f4')
+        self.sent = None      # Buffer contents the page last received
+        self.thresholds = np.zeros(0, dtype='<f4')
+        self.skipped = 0
+        self._packs_since_layout = 0
+
+    def _update_layout(self, samples):
+        """Rebuild the layout if CHOP names or sizes changed - returns True if it did"""
+        shape = [(name, values.size) for name, values in samples]
+        if shape == [(name, length) for name, offset, length in self.layout]:
+            return False
+
+        layout = []
+        offset = 0
+        for name, length in shape:
+            layout.append((name, offset, length))
+            offset += length
+
+        self.layout = tuple(layout)
+        self.buffer = np.zeros(offset, dtype='<f4')
+        self.sent = None
+        self.update_thresholds()
+        self.version += 1
+        return True
+
+    def update_thresholds(self):
+        """Expand the per-CHOP epsilons to one threshold per buffer value"""
+        self.thresholds = np.zeros(self.buffer.size, dtype='<f4')
+        for name, offset, length in self.layout:
+            self.thresholds[offset:offset + length] = self.epsilons.get(name, self.epsilon)
+
+    def layout_json(self):
+        return json.dumps({
+            'version': self.version,
+            'size': int(self.buffer.size),
+            'chops': [[name, offset, length] for name, offset, length in self.layout]
+        })
+
+    def pack(self, chops):
+        """
+        Pack CHOP samples into the buffer.
+
+        Args:
+            chops: {name: CHOP or array} in a stable order
+
+        Returns:
+            (layout_json or None, payload) - layout_json is set when the page
+            needs a new layout first; payload is the base64 buffer, or None
+            when no value moved by more than its epsilon
+        """
+        samples = [(name, chop_samples(chop)) for name, chop in chops.items()]
+        layout_changed = self._update_layout(samples)
+
+        for (name, values), (_, offset, length) in zip(samples, self.layout):
+            self.buffer[offset:offset + length] = values
+
+        self._packs_since_layout += 1
+        layout = None
+        if layout_changed or self._packs_since_layout >= self.layout_interval:
+            layout = self.layout_json()
+            self._packs_since_layout = 0
+
+        if (layout is None and self.sent is not None and
+                not np.any(np.abs(self.buffer - self.sent) > self.thresholds)):
+            self.skipped += 1
+            return None, None
+
+        self.sent = self.buffer.copy()
+        payload = base64.b64encode(self.buffer.tobytes()).decode('ascii')
+        return layout, payload
+
+    def scripts(self, chops):
+        """JavaScript calls for one update - layout (when needed) then packed values"""
+        layout, payload = self.pack(chops)
+        calls = []
+        if layout is not None:
+            calls.append("setChopLayout(" + json.dumps(layout) + ")")
+        if payload is not None:
+            calls.append(f"updateFromTDPacked({self.version}, '{payload}', {sent_ms()})")
+        return calls
+
+
+class ChopDeltaEncoder:
+    """
+    JSON updates carrying only what changed since the last update.
+
+    Per CHOP the update holds a full list (first send, or size changed),
+    {index: value} for the channels that moved by more than the epsilon,
+    or null when the CHOP was dropped. Unchanged CHOPs are left out.
+    """
+
+    def __init__(self, epsilon=DEFAULT_EPSILON, epsilons=None):
+        self.epsilon = epsilon
+        self.epsilons = dict(epsilons or {})
+        self.last = {}        # name -> values the page holds
+        self.skipped = 0
+
+    def encode(self, chops):
+        """
+        Args:
+            chops: {name: CHOP or array}
+
+        Returns:
+            JSON string for updateFromTD, or None when nothing changed
+        """
+        update = {}
+        for name, chop in chops.items():
+            values = chop_samples(chop, np.float64)
+            last = self.last.get(name)
+
+            if last is None or last.size != values.size:
+                self.last[name] = values.copy()
+                update[name] = values.tolist()
+                continue
+
+            changed = np.flatnonzero(np.abs(values - last) > self.epsilons.get(name, self.epsilon))
+            if changed.size == 0:
+                continue
+            # Channels below the epsilon keep their last sent value, so slow drift still goes out
+            last[changed] = values[changed]
+            if changed.size * 2 > values.size:
+                update[name] = last.tolist()
+            else:
+                update[name] = {str(i): float(last[i]) for i in changed}
+
+        for name in [name for name in self.last if name not in chops]:
+            del self.last[name]
+            update[name] = None
+
+        if not update:
+            self.skipped += 1
+            return None
+        return json.dumps(update)
+
+    def reset(self):
+        """Send everything in full with the next update (e.g. after reloading a page)"""
+        self.last.clear()
+
+
+_packer = ChopPacker()
+_delta_encoder = ChopDeltaEncoder()
+
+
+def send_chops(chops, targets):
+    """
+    Pack chops and send them to each Web Render TOP.
+
+    Args:
+        chops: {name: CHOP} - names are what chop(name, index) uses on the page
+        targets: Web Render TOPs (or paths) to update
+    """
+    calls = _packer.scripts(chops)
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            for call in calls:
+                target.executeJavaScript(call)
+
+
+def send_chop_deltas(chops, targets):
+    """
+    Send only the CHOP channels that changed to each Web Render TOP (JSON transport).
+
+    Args:
+        chops: {name: CHOP} - names are what chop(name, index) uses on the page
+        targets: Web Render TOPs (or paths) to update
+    """
+    update = _delta_encoder.encode(chops)
+    if update is None:
+        return
+    call = "updateFromTD(" + json.dumps(update) + f", {sent_ms()})"
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            target.executeJavaScript(call)
+
+
+def set_epsilon(epsilon=None, **epsilons):
+    """
+    Change thresholds - set_epsilon(0.001) for the default,
+    set_epsilon(audio_spectrum=0.01, lfo1=0) per CHOP.
+    """
+    for encoder in (_packer, _delta_encoder):
+        if epsilon is not None:
+            encoder.epsilon = epsilon
+        encoder.epsilons.update(epsilons)
+    _packer.update_thresholds()
+
+
+def get_transport_stats():
+    """Updates skipped because nothing moved by more than its epsilon"""
+    return {
+        'packed_skipped': _packer.skipped,
+        'json_skipped': _delta_encoder.skipped,
+        'layout_version': _packer.version
+    }
+
+
+def reset_layout():
+    """Resend the layout and full values with the next update (e.g. right after reloading a page)"""
+    _packer._packs_since_layout = _packer.layout_interval
+    _delta_encoder.reset()
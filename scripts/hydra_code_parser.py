@@ -0,0 +1,409 @@
+"""
+Hydra code parser for the parameter system
+Turns a scene into a classified token stream in a single linear pass
+Shared by sync_now, apply_now and remove_unused_parameters
+
+No TouchDesigner dependencies - safe to import and time outside TD.
+Install next to manual_triggers as a textDAT named 'hydra_code_parser'.
+"""
+
+import bisect
+import re
+
+# Token kinds
+NUMBER = 'number'
+TEMPLATE = 'template'
+ARROW = 'arrow'
+CALL = 'call'
+
+# Numbers shortly after one of these are expressions, not parameters
+SKIP_PATTERNS = ['time', 'Math.', 'PI', 'frame', 'width', 'height', '=>']
+SKIP_WINDOW = 30
+
+# Number literals: hex, or decimal with optional fraction and exponent (1e-3).
+# The lookbehind keeps digits inside identifiers (o0, s1, lfo2) and after a
+# member dot out - a literal can't start right after a word character
+_NUMBER_PATTERN = (
+    r'(?<![\w$.])-?'
+    r'(?:(?P<hex>0[xX][0-9a-fA-F]+)|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+)
+
+# One alternation, tried left to right at each position:
+#   {{chop.index}} template refs, (args) => body arrow functions,
+#   name( function calls, then number literals (including negatives)
+_TOKEN_RE = re.compile(
+    r'(?P<template>\{\{[^}]*\}\})'
+    r'|(?P<arrow>\([^)]*\)\s*=>\s*[^,)]*)'
+    r'|(?P<call>(?P<func>[A-Za-z_]\w*)\s*\()'
+    r'|(?P<number>' + _NUMBER_PATTERN + r')'
+)
+
+# A '-' after one of these is subtraction (x - 1, f(2)-1), not a sign
+_OPERAND_END = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$)]}')
+
+_SKIP_RE = re.compile('|'.join(re.escape(p) for p in SKIP_PATTERNS))
+
+
+class Token:
+    """A classified slice of scene text"""
+
+    __slots__ = ('kind', 'text', 'start', 'end', 'name', 'chained', 'skipped')
+
+    def __init__(self, kind, text, start, end, name=None, chained=False, skipped=False):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.name = name          # Function name for CALL tokens
+        self.chained = chained    # CALL preceded by '.'
+        self.skipped = skipped    # NUMBER excluded by a skip pattern
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r}, {self.start})"
+
+
+class ParsedScene:
+    """Result of parse_scene - tokens plus the views the trigger functions need"""
+
+    def __init__(self, text, tokens):
+        self.text = text
+        self.tokens = tokens
+
+        # Valid parameter numbers as (num_str, start, end) tuples, in code order
+        self.numbers = [(t.text, t.start, t.end) for t in tokens
+                        if t.kind == NUMBER and not t.skipped]
+
+        # Function calls in code order
+        self.calls = [t for t in tokens if t.kind == CALL]
+
+        # (start, old_end, new_end) of the edit this scene was re-parsed from
+        self.edit = None
+
+
+def _is_chained(code_text, pos):
+    """True if the call at pos is preceded by '.' (ignoring whitespace)"""
+    i = pos - 1
+    while i >= 0 and code_text[i] in ' \t\r\n':
+        i -= 1
+    return i >= 0 and code_text[i] == '.'
+
+
+def _scan(code_text, start=0, stop=None):
+    """Yield classified tokens starting at or after start and before stop"""
+    skip_iter = _SKIP_RE.finditer(code_text, max(0, start - SKIP_WINDOW))
+    next_skip = next(skip_iter, None)
+    last_skip_start = None
+
+    for match in _TOKEN_RE.finditer(code_text, start):
+        kind = match.lastgroup
+        token_start = match.start()
+        if stop is not None and token_start >= stop:
+            break
+
+        if kind == 'number':
+            text = match.group()
+            if text[0] == '-' and _prev_nonspace(code_text, token_start) in _OPERAND_END:
+                # Binary minus - the literal starts after it
+                text = text[1:]
+                token_start += 1
+
+            # Advance skip markers that end at or before this number
+            while next_skip is not None and next_skip.end() <= token_start:
+                last_skip_start = next_skip.start()
+                next_skip = next(skip_iter, None)
+
+            skipped = last_skip_start is not None and last_skip_start >= token_start - SKIP_WINDOW
+            # Hex literals are bit patterns, not slider values
+            skipped = skipped or match.group('hex') is not None
+            yield Token(NUMBER, text, token_start, match.end(), skipped=skipped)
+        elif kind == 'call':
+            yield Token(CALL, match.group(), token_start, match.end(),
+                        name=match.group('func'),
+                        chained=_is_chained(code_text, token_start))
+        elif kind == 'template':
+            yield Token(TEMPLATE, match.group(), token_start, match.end())
+        else:
+            yield Token(ARROW, match.group(), token_start, match.end())
+
+
+def parse_scene(code_text):
+    """
+    Tokenize Hydra code in one forward pass.
+
+    Numbers inside {{...}} templates and arrow function bodies are swallowed
+    by their enclosing token, so they never reach the parameter list. Skip
+    pattern occurrences are scanned in lockstep with the tokens, so the
+    "preceding text" check is a pointer comparison instead of a substring search.
+
+    Args:
+        code_text: Scene code
+
+    Returns:
+        ParsedScene
+    """
+    return ParsedScene(code_text, list(_scan(code_text)))
+
+
+# ===== INCREMENTAL RE-PARSE =====
+
+def _is_chain_start(code_text, line_start, tokens_spanning):
+    """
+    True if a top-level chain starts at line_start - the rescan can restart or stop here.
+
+    The line must begin with an identifier (a source call such as osc/noise/src),
+    sit outside any (...) or {...}, and not be covered by an existing token.
+    """
+    if line_start >= len(code_text):
+        return True
+    first = code_text[line_start]
+    if not (first.isalpha() or first == '_'):
+        return False
+    if code_text.count('(', 0, line_start) != code_text.count(')', 0, line_start):
+        return False
+    if code_text.count('{', 0, line_start) != code_text.count('}', 0, line_start):
+        return False
+    return not tokens_spanning(line_start)
+
+
+def _spanning(tokens):
+    """Return a predicate telling whether any of tokens covers a position (tokens sorted by start)"""
+    starts = [t.start for t in tokens]
+
+    def check(pos):
+        i = bisect.bisect_left(starts, pos) - 1
+        return i >= 0 and tokens[i].end > pos
+    return check
+
+
+def _common_prefix_len(a, b):
+    """Length of the common prefix - binary search over slice compares (runs in C)"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(a, b, limit):
+    """Length of the common suffix, at most limit characters"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def reparse_scene(previous, code_text):
+    """
+    Re-tokenize only the chains touched by an edit.
+
+    The edit is the span between the common prefix and common suffix of the
+    old and new text. Scanning restarts at the chain containing the edit and
+    stops at the first chain start after it (plus the skip-pattern window);
+    tokens outside that range are reused, shifted by the length change.
+
+    Args:
+        previous: ParsedScene for the last analysed text (or None)
+        code_text: New scene code
+
+    Returns:
+        ParsedScene - with .edit = (start, old_end, new_end) when re-parsed incrementally
+    """
+    if previous is None:
+        return parse_scene(code_text)
+
+    old_text = previous.text
+    if old_text == code_text:
+        return previous
+
+    prefix = _common_prefix_len(old_text, code_text)
+    suffix = _common_suffix_len(old_text, code_text,
+                                min(len(old_text), len(code_text)) - prefix)
+    old_edit_end = len(old_text) - suffix
+    new_edit_end = len(code_text) - suffix
+    delta = len(code_text) - len(old_text)
+
+    old_tokens = previous.tokens
+    old_spans = _spanning(old_tokens)
+    no_spans = lambda pos: False
+
+    # Restart point: chain start at or before the edit (prefix text is shared)
+    restart = code_text.rfind('\n', 0, prefix) + 1
+    while restart > 0 and not (_is_chain_start(old_text, restart, old_spans) and
+                               _is_chain_start(code_text, restart, no_spans)):
+        restart = code_text.rfind('\n', 0, restart - 1) + 1
+
+    # Stop point: first chain start past the edit and the skip window (suffix text is shared)
+    stop_new = len(code_text)
+    line_start = code_text.find('\n', new_edit_end + SKIP_WINDOW)
+    while line_start != -1:
+        line_start += 1
+        if (_is_chain_start(old_text, line_start - delta, old_spans) and
+                _is_chain_start(code_text, line_start, no_spans)):
+            stop_new = line_start
+            break
+        line_start = code_text.find('\n', line_start)
+    stop_old = stop_new - delta
+
+    # Rescan the affected chains against the full text
+    middle = list(_scan(code_text, restart, stop_new))
+    if middle and middle[-1].end > stop_new:
+        # A token ran past the stop point - nothing safe to reuse after the edit
+        return parse_scene(code_text)
+
+    head = [t for t in old_tokens if t.end <= restart]
+    tail = [Token(t.kind, t.text, t.start + delta, t.end + delta,
+                  name=t.name, chained=t.chained, skipped=t.skipped)
+            for t in old_tokens if t.start >= stop_old]
+    if tail and tail[0].kind == CALL:
+        # Its '.' lookback can reach into the edited region
+        tail[0].chained = _is_chained(code_text, tail[0].start)
+
+    parsed = ParsedScene(code_text, head + middle + tail)
+    parsed.edit = (prefix, old_edit_end, new_edit_end)
+    return parsed
+
+
+# ===== SPLICE BUILDER =====
+
+def splice(code_text, replacements):
+    """
+    Apply text replacements in a single join instead of re-slicing the whole scene per edit.
+
+    Args:
+        code_text: Original code
+        replacements: (start, end, new_text) tuples, sorted by start and non-overlapping
+
+    Returns:
+        New code string (code_text itself when there is nothing to replace)
+    """
+    if not replacements:
+        return code_text
+
+    parts = []
+    pos = 0
+    for start, end, new_text in replacements:
+        parts.append(code_text[pos:start])
+        parts.append(new_text)
+        pos = end
+    parts.append(code_text[pos:])
+    return ''.join(parts)
+
+
+# ===== LIVE ARGUMENT DETECTION =====
+
+_BRACKET_RE = re.compile(r'[()\[\]{}]')
+
+
+def _prev_nonspace(code_text, pos):
+    i = pos - 1
+    while i >= 0 and code_text[i] in ' \t\r\n':
+        i -= 1
+    return code_text[i] if i >= 0 else ''
+
+
+def _next_nonspace(code_text, pos):
+    i = pos
+    while i < len(code_text) and code_text[i] in ' \t\r\n':
+        i += 1
+    return code_text[i] if i < len(code_text) else ''
+
+
+def whole_argument_indices(code_text, numbers):
+    """
+    Indices of numbers that form a complete function call argument.
+
+    osc(10, 0.1) -> both; .rotate(3.14/4), [0.3, 0.7] and (0.5) grouping
+    parens -> none. Only these can be swapped for a () => value function
+    without changing what the expression means.
+
+    Args:
+        code_text: Scene code
+        numbers: (num_str, start, end) tuples in code order (ParsedScene.numbers)
+
+    Returns:
+        List of indices into numbers
+    """
+    indices = []
+    stack = []  # (bracket, is_call_paren)
+    brackets = _BRACKET_RE.finditer(code_text)
+    next_bracket = next(brackets, None)
+
+    for i, (num_str, start, end) in enumerate(numbers):
+        # Bring the bracket stack up to this number
+        while next_bracket is not None and next_bracket.start() < start:
+            ch = next_bracket.group()
+            if ch in '([{':
+                prev = _prev_nonspace(code_text, next_bracket.start())
+                stack.append((ch, ch == '(' and (prev.isalnum() or prev == '_')))
+            elif stack:
+                stack.pop()
+            next_bracket = next(brackets, None)
+
+        if not stack or not stack[-1][1]:
+            continue
+        before = _prev_nonspace(code_text, start)
+        after = _next_nonspace(code_text, end)
+        if before and before in '(,' and after and after in ',)':
+            indices.append(i)
+
+    return indices
+
+
+_ARGUMENT_RE = re.compile(r'[()\[\]{},]')
+
+
+def _callee(code_text, pos):
+    """Name called by the '(' at pos, with any member qualifier: 'osc', '.rotate', 'Math.sin'"""
+    end = pos
+    while end > 0 and code_text[end - 1] in ' \t\r\n':
+        end -= 1
+    start = end
+    while start > 0 and (code_text[start - 1].isalnum() or code_text[start - 1] in '_$.'):
+        start -= 1
+    return code_text[start:end]
+
+
+def argument_spans(code_text, calls=False):
+    """
+    (start, end) of every function call argument, whitespace trimmed.
+
+    Inner calls close first, so nested arguments come before the argument
+    that contains them: osc(noise(2) * 3) -> [(10, 11), (4, 16)].
+    With calls, each span also carries the callee (see _callee):
+    [(10, 11, 'noise'), (4, 16, 'osc')].
+    """
+    spans = []
+    stack = []  # [bracket, callee (None unless a call paren), argument_start]
+
+    def close_argument(arg_start, arg_end, callee):
+        while arg_start < arg_end and code_text[arg_start] in ' \t\r\n':
+            arg_start += 1
+        while arg_end > arg_start and code_text[arg_end - 1] in ' \t\r\n':
+            arg_end -= 1
+        if arg_start < arg_end:
+            spans.append((arg_start, arg_end, callee) if calls else (arg_start, arg_end))
+
+    for match in _ARGUMENT_RE.finditer(code_text):
+        ch = match.group()
+        pos = match.start()
+        if ch in '([{':
+            prev = _prev_nonspace(code_text, pos)
+            is_call = ch == '(' and (prev.isalnum() or prev == '_')
+            stack.append([ch, _callee(code_text, pos) if is_call else None, pos + 1])
+        elif ch == ',':
+            if stack and stack[-1][1] is not None:
+                close_argument(stack[-1][2], pos, stack[-1][1])
+                stack[-1][2] = pos + 1
+        elif stack:
+            bracket, callee, arg_start = stack.pop()
+            if callee is not None:
+                close_argument(arg_start, pos, callee)
+
+    return spans
@@ -5,6 +5,35 @@ Run this to update your manual_triggers DAT with the consolidated, fixed version
 
 import sys
 
+# Modules imported by manual_triggers - installed as sibling textDATs
+COMPANION_MODULES = ['hydra_code_parser']
+
+CODE_MANAGER_PATH = '/project1/hydra_system/code/CodeManager'
+SCENE_REGISTRY_PATH = CODE_MANAGER_PATH + '/scene_registry'
+
+# DAT Execute on scene_registry - drops the cached scene and switches per-scene parameters
+SCENE_REGISTRY_CALLBACK = 'scene_registry_exec'
+SCENE_REGISTRY_CALLBACK_TEXT = """# Created by install_fixed_triggers
+def onTableChange(dat):
+    op('manual_triggers').module.on_scene_registry_change()
+    return
+"""
+
+# Parameter Execute and OP Execute on the CodeManager DATs - a select index,
+# 'dat' reference or wire change makes manual_triggers trace the chains again
+SOURCE_PARAMS_CALLBACK = 'source_graph_params'
+SOURCE_PARAMS_CALLBACK_TEXT = """# Created by install_fixed_triggers
+def onValueChange(par, prev):
+    op('manual_triggers').module.invalidate_source_graph()
+    return
+"""
+SOURCE_WIRES_CALLBACK = 'source_graph_wires'
+SOURCE_WIRES_CALLBACK_TEXT = """# Created by install_fixed_triggers
+def onWireChange(changeOp):
+    op('manual_triggers').module.invalidate_source_graph()
+    return
+"""
+
 def install_fixed_triggers():
     print("=" * 70)
     print("INSTALLING FIXED MANUAL TRIGGERS")
@@ -25,6 +54,23 @@ def install_fixed_triggers():
         print("ERROR: direct_param_controller not found")
         return False
 
+    # Install the pure-Python modules that manual_triggers imports by name
+    for module_name in COMPANION_MODULES:
+        module_path = f'C:/Users/cuban/HydraToTD/scripts/{module_name}.py'
+        try:
+            with open(module_path, 'r', encoding='utf-8') as f:
+                module_code = f.read()
+        except Exception as e:
+            print(f"ERROR reading {module_name}: {e}")
+            return False
+
+        module_dat = controller.op(module_name)
+        if not module_dat:
+            print(f"Creating {module_name} DAT...")
+            module_dat = controller.create(textDAT, module_name)
+        module_dat.text = module_code
+        print(f"✓ Updated: {module_dat.path}")
+
     manual_triggers = controller.op('manual_triggers')
     if not manual_triggers:
         print("Creating manual_triggers DAT...")
@@ -34,6 +80,37 @@ def install_fixed_triggers():
     manual_triggers.text = fixed_code
     print(f"✓ Updated: {manual_triggers.path}")
 
+    # Tell manual_triggers when the active scene changes
+    registry_callback = controller.op(SCENE_REGISTRY_CALLBACK)
+    if not registry_callback:
+        print(f"Creating {SCENE_REGISTRY_CALLBACK} DAT...")
+        registry_callback = controller.create(datexecuteDAT, SCENE_REGISTRY_CALLBACK)
+    registry_callback.text = SCENE_REGISTRY_CALLBACK_TEXT
+    registry_callback.par.dat = SCENE_REGISTRY_PATH
+    registry_callback.par.tablechange = True
+    print(f"✓ Updated: {registry_callback.path} (watching {SCENE_REGISTRY_PATH})")
+
+    # Tell manual_triggers when a scene DAT chain is re-pointed or rewired
+    params_callback = controller.op(SOURCE_PARAMS_CALLBACK)
+    if not params_callback:
+        print(f"Creating {SOURCE_PARAMS_CALLBACK} DAT...")
+        params_callback = controller.create(parameterexecuteDAT, SOURCE_PARAMS_CALLBACK)
+    params_callback.text = SOURCE_PARAMS_CALLBACK_TEXT
+    params_callback.par.op = CODE_MANAGER_PATH + '/*'
+    params_callback.par.pars = 'dat index select'
+    params_callback.par.custom = False
+    params_callback.par.builtin = True
+    params_callback.par.valuechange = True
+
+    wires_callback = controller.op(SOURCE_WIRES_CALLBACK)
+    if not wires_callback:
+        print(f"Creating {SOURCE_WIRES_CALLBACK} DAT...")
+        wires_callback = controller.create(opexecuteDAT, SOURCE_WIRES_CALLBACK)
+    wires_callback.text = SOURCE_WIRES_CALLBACK_TEXT
+    wires_callback.par.op = CODE_MANAGER_PATH + '/*'
+    wires_callback.par.wirechange = True
+    print(f"✓ Updated: {params_callback.path}, {wires_callback.path} (watching {CODE_MANAGER_PATH})")
+
     print("\n" + "=" * 70)
     print("INSTALLATION COMPLETE!")
     print("=" * 70)
@@ -1,11 +1,274 @@
 # Enhanced Manual Triggers - FIXED VERSION (FAST)
 # Based on the working lightweight script with TD-compliant naming
 # No external dependencies - simple and fast
+# Scene text is tokenized once by hydra_code_parser (textDAT next to this one)
 
+import bisect
+import functools
+import hashlib
+import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import hydra_code_parser
+
+
+# ===== LOGGING AND PROFILING =====
+
+# Per-parameter / per-position detail in the textport - printing is itself slow,
+# so it is off by default. Errors and one summary line per call always print.
+VERBOSE = False
+
+
+def log(message):
+    """Print detail output only in verbose mode"""
+    if VERBOSE:
+        print(message)
+
+
+def set_verbose(enabled=True):
+    global VERBOSE
+    VERBOSE = enabled
+
+
+# Stages recorded by the profiler, in pipeline order
+PROFILE_STAGES = ['scene lookup', 'regex scan', 'context analysis', 'rgb grouping',
+                  'plan cache hit', 'parameter creation', 'parameter removal',
+                  'value writes', 'dat write']
+
+# Optional tableDAT that receives one row per profiled call (None = ring buffer only)
+PROFILE_TABLE_PATH = None
+
+
+class StageProfiler:
+    """
+    Elapsed time per stage for sync/apply/cleanup calls, kept in a ring buffer.
+
+    A call opens a record with begin(); mark(stage) charges the time since the
+    previous mark to that stage. Calls may nest (cleanup_and_sync) - each gets
+    its own record.
+    """
+
+    def __init__(self, max_records=200):
+        self.records = deque(maxlen=max_records)
+        self._stack = []
+
+    def begin(self, operation):
+        now = time.perf_counter()
+        self._stack.append({'operation': operation, 'start': now, 'last': now, 'stages': OrderedDict(),
+                            'thread': threading.get_ident()})
+
+    def mark(self, stage):
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        # Plans built by warm-up workers aren't part of the call being timed
+        if frame['thread'] != threading.get_ident():
+            return
+        now = time.perf_counter()
+        frame['stages'][stage] = frame['stages'].get(stage, 0.0) + (now - frame['last']) * 1000
+        frame['last'] = now
+
+    def end(self):
+        frame = self._stack.pop()
+        now = time.perf_counter()
+        record = {
+            'operation': frame['operation'],
+            'time': time.time(),
+            'total_ms': (now - frame['start']) * 1000,
+            'stages': dict(frame['stages'])
+        }
+        self.records.append(record)
+        if PROFILE_TABLE_PATH:
+            _write_profile_row(record, self.records.maxlen)
+        return record
+
+    def summary(self, operation=None):
+        """Mean ms per stage (and total) over the buffered records"""
+        records = [r for r in self.records if operation is None or r['operation'] == operation]
+        if not records:
+            return {}
+        totals = OrderedDict((stage, 0.0) for stage in PROFILE_STAGES)
+        totals['total'] = 0.0
+        for record in records:
+            for stage, ms in record['stages'].items():
+                totals[stage] = totals.get(stage, 0.0) + ms
+            totals['total'] += record['total_ms']
+        return OrderedDict((stage, ms / len(records)) for stage, ms in totals.items())
+
+
+_profiler = StageProfiler()
+
+
+def profiled(operation):
+    """Decorator - record a profile for every call of the wrapped function"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _profiler.begin(operation)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _profiler.end()
+        return wrapper
+    return decorate
+
+
+def _write_profile_row(record, max_rows):
+    table = op(PROFILE_TABLE_PATH)
+    if not table:
+        return
+    header = ['time', 'operation', 'total_ms'] + PROFILE_STAGES
+    if table.numRows == 0 or table[0, 0].val != 'time':
+        table.clear()
+        table.appendRow(header)
+    table.appendRow([time.strftime('%H:%M:%S', time.localtime(record['time'])), record['operation'],
+                     f"{record['total_ms']:.3f}"] +
+                    [f"{record['stages'][stage]:.3f}" if stage in record['stages'] else ''
+                     for stage in PROFILE_STAGES])
+    while table.numRows > max_rows + 1:
+        table.deleteRow(1)
+
+
+def get_profile(last=None):
+    """Buffered profile records, oldest first"""
+    records = list(_profiler.records)
+    return records[-last:] if last else records
+
+
+def print_profile(operation=None):
+    """Mean time per stage over the buffered records"""
+    summary = _profiler.summary(operation)
+    if not summary:
+        print("No profile records yet")
+        return
+    count = len([r for r in _profiler.records if operation is None or r['operation'] == operation])
+    print(f"Profile ({operation or 'all calls'}, mean of {count}):")
+    for stage, ms in summary.items():
+        if ms > 0 or stage == 'total':
+            print(f"  {stage:<20} {ms:9.3f}ms")
+
+
+def clear_profile():
+    _profiler.records.clear()
 
 # ===== SOURCE TRACING HELPER FUNCTIONS =====
 
+def _select_index(dat):
+    """Selected input of a select/switch DAT (0 if it has no index parameter)"""
+    if hasattr(dat.par, 'select'):
+        return int(dat.par.select.eval())
+    if hasattr(dat.par, 'index'):
+        return int(dat.par.index.eval())
+    return 0
+
+
+def _next_in_chain(dat):
+    """
+    One step up the chain: the DAT that feeds dat.
+
+    selectDAT -> its 'dat' parameter reference, else its selected input
+    switchDAT -> its selected input
+    other DATs -> their first input
+    """
+    if dat.OPType == 'selectDAT' and hasattr(dat.par, 'dat'):
+        try:
+            dat_path = dat.par.dat.eval()
+        except Exception:
+            dat_path = None
+        if dat_path:
+            referenced_dat = op(dat_path)
+            if referenced_dat:
+                return referenced_dat
+
+    if dat.inputs:
+        index = 0
+        if dat.OPType in ('selectDAT', 'switchDAT'):
+            index = _select_index(dat)
+        if 0 <= index < len(dat.inputs) and dat.inputs[index]:
+            return dat.inputs[index]
+
+    return None
+
+
+class SourceGraph:
+    """
+    Memoized chain from each scene DAT back to its original source.
+
+    The chain is walked once per scene DAT: selectDATs, SceneCodeSender,
+    then the SceneCode-tagged source. The write targets are ordered once:
+    SceneCode, then SceneCodeSender, then other textDATs. A cached chain is
+    reused until invalidate() bumps the version - the callbacks created by
+    install_fixed_triggers call it when a select index, a 'dat' reference or
+    a wire in CodeManager changes, and on scene changes. A lookup only checks
+    that the chain's DATs still exist.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}    # scene DAT path -> entry dict
+
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
+
+    def _build(self, dat_op):
+        chain = []
+        visited = set()
+        current = dat_op
+        while current is not None and current.path not in visited:
+            visited.add(current.path)
+            chain.append(current)
+            # Found the original source - stop here
+            if 'SceneCode' in current.tags:
+                break
+            current = _next_in_chain(current)
+
+        # Original source: the SceneCode tagged DAT, else the end of the chain
+        source = next((d for d in chain if 'SceneCode' in d.tags), chain[-1])
+
+        # Prioritize SceneCode tagged DATs (no inputs = original source),
+        # then SceneCodeSender tagged DATs, then any other textDAT in the chain
+        targets = [d for d in chain if 'SceneCode' in d.tags]
+        targets += [d for d in chain if 'SceneCodeSender' in d.tags and d not in targets]
+        targets += [d for d in chain if d not in targets and d.OPType == 'textDAT']
+
+        return {'chain': chain, 'source': source, 'targets': targets, 'version': self.version}
+
+    def _is_current(self, entry):
+        return entry['version'] == self.version and all(dat.valid for dat in entry['chain'])
+
+    def get(self, dat_op):
+        entry = self._entries.get(dat_op.path)
+        if entry is not None and self._is_current(entry):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self._build(dat_op)
+        self._entries[dat_op.path] = entry
+        return entry
+
+
+_source_graph = SourceGraph()
+
+
+def get_source_entry(dat_op):
+    """
+    Cached chain for a scene DAT.
+
+    Returns:
+        Dict with 'chain' (DATs from dat_op to the source), 'source' (original
+        source textDAT) and 'targets' (DATs to try writing, in priority order)
+    """
+    return _source_graph.get(dat_op)
+
+
 def trace_to_source_dat(dat_op):
     """
     Trace from a DAT back to the original source textDAT by following inputs and dat parameters.
@@ -15,210 +278,296 @@ def trace_to_source_dat(dat_op):
         dat_op: The DAT operator to trace from
 
     Returns:
-        The original source textDAT with 'SceneCode' tag, or the input dat_op if no source found
+        The original source textDAT with 'SceneCode' tag, or the end of the chain if no source found
     """
+    return get_source_entry(dat_op)['source']
 
-    # Check if this DAT itself has the SceneCode tag (we found the source!)
-    if 'SceneCode' in dat_op.tags:
-        return dat_op
-
-    # If this DAT has inputs, follow them
-    if dat_op.inputs and len(dat_op.inputs) > 0:
-        # For selectDAT, get the currently selected input
-        if dat_op.OPType == 'selectDAT':
-            # Try to get the select index
-            select_index = 0
-            if hasattr(dat_op.par, 'select'):
-                select_index = int(dat_op.par.select.eval())
-            elif hasattr(dat_op.par, 'index'):
-                select_index = int(dat_op.par.index.eval())
-
-            if len(dat_op.inputs) > select_index:
-                input_dat = dat_op.inputs[select_index]
-                if input_dat:
-                    # Recursively trace from the selected input
-                    return trace_to_source_dat(input_dat)
-        else:
-            # For other DATs, just follow the first input
-            input_dat = dat_op.inputs[0]
-            if input_dat:
-                # Recursively trace from the input
-                return trace_to_source_dat(input_dat)
-
-    # For selectDAT, also check the 'dat' parameter (parameter-based reference)
-    if dat_op.OPType == 'selectDAT':
-        try:
-            # SelectDAT has a 'dat' parameter that references the source DAT
-            if hasattr(dat_op.par, 'dat'):
-                dat_path = dat_op.par.dat.eval()
-                if dat_path:
-                    referenced_dat = op(dat_path)
-                    if referenced_dat:
-                        # Recursively trace from the referenced DAT
-                        return trace_to_source_dat(referenced_dat)
-        except Exception as e:
-            pass
 
-    # No inputs or couldn't find source - return current DAT as fallback
-    return dat_op
+def invalidate_source_graph():
+    """
+    Drop cached DAT chains - called by the CodeManager callbacks from
+    install_fixed_triggers (select indices, 'dat' references, wires) and on
+    scene changes; call it yourself after rewiring elsewhere
+    """
+    _source_graph.invalidate()
+
 
-def get_current_scene_code():
-    """Get the currently running scene code DAT"""
-    # Check the scene_registry tableDAT for the active scene
-    scene_registry = op('/project1/hydra_system/code/CodeManager/scene_registry')
-    if scene_registry:
-        try:
-            # Look through the table to find the active scene
-            for row in range(scene_registry.numRows):
-                if row == 0:  # Skip header row
-                    continue
-
-                # Find the column indices for 'active' and 'dat_name'
-                active_col = None
-                dat_name_col = None
-
-                for col in range(scene_registry.numCols):
-                    header = str(scene_registry[0, col].val).lower()
-                    if header in ['active', 'is_active', 'current']:
-                        active_col = col
-                    elif header in ['dat_name', 'datname', 'dat', 'code_dat']:
-                        dat_name_col = col
-
-                # If we found the active column, check if this scene is active
-                if active_col is not None:
-                    active_val = scene_registry[row, active_col].val
-                    # Check for various ways "active" might be represented
-                    is_active = (active_val == 1 or
-                               active_val == True or
-                               str(active_val).lower() in ['true', '1', 'yes', 'active'])
-
-                    if is_active:
-                        # Get the DAT name directly from dat_name column
-                        if dat_name_col is not None:
-                            dat_name = str(scene_registry[row, dat_name_col].val)
+def get_source_graph_stats():
+    return {
+        'hits': _source_graph.hits,
+        'misses': _source_graph.misses,
+        'version': _source_graph.version
+    }
+
+
+# ===== ACTIVE SCENE RESOLUTION =====
+
+CODE_MANAGER_PATH = '/project1/hydra_system/code/CodeManager'
+SCENE_REGISTRY_PATH = CODE_MANAGER_PATH + '/scene_registry'
+
+ACTIVE_HEADERS = ['active', 'is_active', 'current']
+DAT_NAME_HEADERS = ['dat_name', 'datname', 'dat', 'code_dat']
+
+
+def _is_active_value(active_val):
+    # Check for various ways "active" might be represented
+    return (active_val == 1 or
+            active_val == True or
+            str(active_val).lower() in ['true', '1', 'yes', 'active'])
+
+
+class SceneResolver:
+    """
+    Finds the active scene code DAT, caching the result between calls.
+
+    The registry header layout is read once. The cached DAT is reused while
+    the registry has the same shape and the same active column, and the DAT
+    still exists. That is one cell read per registry row, with no header
+    scan and no CodeManager children walk. A DAT Execute on scene_registry
+    can call invalidate() for changes the check can't see, such as renamed
+    dat_name cells.
+
+    Fallbacks (first non-empty scene, scene1_code) are never cached - a
+    scene registered or filled in later is picked up on the next call.
+    """
+
+    def __init__(self):
+        self.version = 0      # Bumped on every invalidate()
+        self.hits = 0
+        self.misses = 0
+        self._cache = None
+        self._fallback = None  # Last fallback reported, so it's printed once
+
+    def invalidate(self):
+        self.version += 1
+        self._cache = None
+
+    def _layout(self, registry):
+        """Column indices for 'active' and 'dat_name' from the header row"""
+        active_col = None
+        dat_name_col = None
+        for col in range(registry.numCols):
+            header = str(registry[0, col].val).lower()
+            if header in ACTIVE_HEADERS:
+                active_col = col
+            elif header in DAT_NAME_HEADERS:
+                dat_name_col = col
+        return active_col, dat_name_col
+
+    def _snapshot(self, registry, active_col):
+        """The active column - scene switches change it"""
+        if registry is None:
+            return None
+        shape = (registry.numRows, registry.numCols)
+        if active_col is None:
+            return shape
+        return shape + tuple(str(registry[row, active_col].val) for row in range(1, registry.numRows))
+
+    def resolve(self):
+        registry = op(SCENE_REGISTRY_PATH)
+        cache = self._cache
+        if (cache is not None and registry is cache['registry'] and cache['dat'].valid and
+                self._snapshot(registry, cache['active_col']) == cache['snapshot']):
+            self.hits += 1
+            return cache['dat']
+
+        self.misses += 1
+        active_col = None
+        dat_name_col = None
+        if registry:
+            try:
+                active_col, dat_name_col = self._layout(registry)
+            except Exception as e:
+                print(f"Error reading scene_registry: {e}")
+                registry = None
+
+        scene_code, fallback = self._lookup(registry, active_col, dat_name_col)
+        if scene_code is not None and fallback is None:
+            self._cache = {
+                'registry': registry,
+                'active_col': active_col,
+                'snapshot': self._snapshot(registry, active_col),
+                'dat': scene_code
+            }
+            self._fallback = None
+        else:
+            self._cache = None
+            reported = (fallback, scene_code.path if scene_code is not None else None)
+            if reported != self._fallback:
+                if scene_code is not None:
+                    print(f"No active scene in scene_registry - falling back to {fallback}: {scene_code.name}")
+                else:
+                    print("ERROR: No scene code found")
+                self._fallback = reported
+        return scene_code
+
+    def _lookup(self, scene_registry, active_col, dat_name_col):
+        """
+        Uncached lookup - registry first, then the first non-empty scene.
+
+        Returns:
+            (scene DAT or None, None if it came from the registry else the fallback used)
+        """
+        if scene_registry:
+            try:
+                # Look through the table to find the active scene
+                for row in range(1, scene_registry.numRows):
+                    # If we found the active column, check if this scene is active
+                    if active_col is None:
+                        break
+                    if not _is_active_value(scene_registry[row, active_col].val):
+                        continue
+
+                    # Get the DAT name directly from dat_name column
+                    if dat_name_col is not None:
+                        dat_name = str(scene_registry[row, dat_name_col].val)
+                    else:
+                        # Fallback: try to find scene name and construct
+                        scene_name_val = scene_registry[row, 0].val if active_col != 0 else scene_registry[row, 1].val
+                        if isinstance(scene_name_val, (int, float)):
+                            dat_name = f"scene{int(scene_name_val)}_code"
                         else:
-                            # Fallback: try to find scene name and construct
-                            scene_name_val = scene_registry[row, 0].val if active_col != 0 else scene_registry[row, 1].val
-                            if isinstance(scene_name_val, (int, float)):
-                                dat_name = f"scene{int(scene_name_val)}_code"
+                            # Extract number from scene name like "Scene 2"
+                            scene_str = str(scene_name_val)
+                            numbers = re.findall(r'\d+', scene_str)
+                            if numbers:
+                                dat_name = f"scene{numbers[0]}_code"
                             else:
-                                # Extract number from scene name like "Scene 2"
-                                scene_str = str(scene_name_val)
-                                numbers = re.findall(r'\d+', scene_str)
-                                if numbers:
-                                    dat_name = f"scene{numbers[0]}_code"
-                                else:
-                                    dat_name = "scene1_code"  # fallback
-
-                        # Try to get the actual scene code DAT
-                        scene_code = op(f'/project1/hydra_system/code/CodeManager/{dat_name}')
-                        if scene_code:
-                            print(f"Found active scene from registry: {dat_name}")
-                            return scene_code
-                        else:
-                            print(f"Scene registry indicates {dat_name} is active, but DAT not found")
+                                dat_name = "scene1_code"  # fallback
 
-            print("No active scene found in scene_registry")
-        except Exception as e:
-            print(f"Error reading scene_registry: {e}")
-    else:
-        print("scene_registry not found")
+                    # Try to get the actual scene code DAT
+                    scene_code = op(f'{CODE_MANAGER_PATH}/{dat_name}')
+                    if scene_code:
+                        log(f"Found active scene from registry: {dat_name}")
+                        return scene_code, None
+                    else:
+                        log(f"Scene registry indicates {dat_name} is active, but DAT not found")
 
-    # Fallback: Find the first non-empty scene
-    code_manager = op('/project1/hydra_system/code/CodeManager')
-    if code_manager:
-        scene_codes = []
-        for child in code_manager.children:
-            if child.name.endswith('_code') and child.name.startswith('scene'):
-                scene_codes.append(child)
-
-        if scene_codes:
-            # Use the first scene with content as fallback
-            active_scenes = [sc for sc in scene_codes if sc.text.strip()]
-            if active_scenes:
-                current_scene = active_scenes[0]
-                print(f"Fallback to first non-empty scene: {current_scene.name}")
-                return current_scene
-
-    # Final fallback to scene1_code
-    fallback_scene = op('/project1/hydra_system/code/CodeManager/scene1_code')
-    if fallback_scene:
-        print("Final fallback to scene1_code")
-        return fallback_scene
-
-    print("ERROR: No scene code found")
-    return None
+                log("No active scene found in scene_registry")
+            except Exception as e:
+                print(f"Error reading scene_registry: {e}")
+        else:
+            log("scene_registry not found")
+
+        # Fallback: Find the first non-empty scene
+        code_manager = op(CODE_MANAGER_PATH)
+        if code_manager:
+            scene_codes = []
+            for child in code_manager.children:
+                if child.name.endswith('_code') and child.name.startswith('scene'):
+                    scene_codes.append(child)
+
+            if scene_codes:
+                # Use the first scene with content as fallback
+                active_scenes = [sc for sc in scene_codes if sc.text.strip()]
+                if active_scenes:
+                    return active_scenes[0], 'first non-empty scene'
+
+        # Final fallback to scene1_code
+        fallback_scene = op(f'{CODE_MANAGER_PATH}/scene1_code')
+        if fallback_scene:
+            return fallback_scene, 'scene1_code'
 
+        return None, 'none'
 
-def preprocess_code_structure(code_text):
-    """Pre-calculate function positions and chain positions for fast lookup"""
-    # Find all function calls in the code
-    func_pattern = r'(\w+)\s*\('
-    all_functions = list(re.finditer(func_pattern, code_text))
+
+_scene_resolver = SceneResolver()
+
+
+def get_current_scene_code():
+    """Get the currently running scene code DAT (cached - see SceneResolver)"""
+    return _scene_resolver.resolve()
+
+
+def invalidate_scene_cache():
+    """
+    Drop the cached active scene - on_scene_registry_change() calls this from
+    the DAT Execute on scene_registry (see install_fixed_triggers):
+        def onTableChange(dat):
+            op('manual_triggers').module.on_scene_registry_change()
+    """
+    _scene_resolver.invalidate()
+
+
+def get_scene_cache_stats():
+    return {
+        'hits': _scene_resolver.hits,
+        'misses': _scene_resolver.misses,
+        'version': _scene_resolver.version
+    }
+
+
+def preprocess_code_structure(code_text, parsed=None):
+    """
+    Pre-calculate function positions and chain positions for fast lookup
+
+    One forward pass over the lines assigns each line its chain position:
+    lines starting with '.' continue the chain (1, 2, 3...), any other
+    non-blank line starts a new one (0), blank lines are skipped. Each
+    function call then finds its line with a binary search.
+    """
+    # Function calls come straight from the token stream
+    if parsed is None:
+        parsed = hydra_code_parser.parse_scene(code_text)
+    all_functions = parsed.calls
 
     # Build a map of position -> (function_name, chain_position)
     func_info_map = {}
 
-    # Split code into lines once
-    lines = code_text.split('\n')
-    line_starts = [0]
-    for line in lines[:-1]:
-        line_starts.append(line_starts[-1] + len(line) + 1)  # +1 for newline
+    # Line start offsets, chain position and chain number per line in a single pass
+    line_starts = []
+    line_chain_positions = []
+    line_chains = []
+    offset = 0
+    run = 0
+    chain = 0
+    for line in code_text.split('\n'):
+        line_starts.append(offset)
+        offset += len(line) + 1  # +1 for newline
+
+        stripped = line.strip()
+        if stripped.startswith('.'):
+            # Chained function - one further along than the previous chained line
+            run += 1
+        elif stripped:
+            # Start of a new chain
+            run = 0
+            chain += 1
+        line_chain_positions.append(run if stripped.startswith('.') else 0)
+        line_chains.append(chain)
+
+    # Anchors name a call by structure rather than position: the chain by its
+    # source ('osc1' = second chain starting with osc) and the call by its
+    # occurrence within the chain ('kaleid0'), so inserting a call elsewhere
+    # in the chain leaves them unchanged
+    chain_sources = {}
+    source_counts = {}
+    call_counts = {}
 
-    # For each function, calculate its chain position
     for func_match in all_functions:
-        func_name = func_match.group(1).lower()
-        func_pos = func_match.start()
-
-        # Find which line this function is on
-        func_line_idx = 0
-        for i, start in enumerate(line_starts):
-            if func_pos >= start:
-                func_line_idx = i
-            else:
-                break
-
-        # Walk backwards from this line to find chain start
-        chain_position = 0
-        for idx in range(func_line_idx, -1, -1):
-            stripped = lines[idx].strip()
-            if not stripped:
-                continue
-            if stripped.startswith('.'):
-                # This is a chained function
-                if idx < func_line_idx:
-                    chain_position += 1
-            else:
-                # Found the start of the chain
-                break
-
-        # If current line starts with '.', it's part of a chain
-        if lines[func_line_idx].strip().startswith('.'):
-            # Count how many dots we've seen up to this point
-            for idx in range(func_line_idx, -1, -1):
-                stripped = lines[idx].strip()
-                if not stripped:
-                    continue
-                if stripped.startswith('.'):
-                    if idx == func_line_idx:
-                        # Include this one
-                        chain_position += 1
-                        break
-                    else:
-                        chain_position += 1
-                else:
-                    break
+        func_pos = func_match.start
+        func_line_idx = bisect.bisect_right(line_starts, func_pos) - 1
+        func_name = func_match.name.lower()
+
+        chain = line_chains[func_line_idx]
+        if chain not in chain_sources:
+            count = source_counts.get(func_name, 0)
+            source_counts[func_name] = count + 1
+            chain_sources[chain] = f"{func_name}{count}"
+        occurrence = call_counts.get((chain, func_name), 0)
+        call_counts[(chain, func_name)] = occurrence + 1
 
         func_info_map[func_pos] = {
             'name': func_name,
-            'chain_position': chain_position,
+            'chain_position': line_chain_positions[func_line_idx],
+            'anchor': f"{chain_sources[chain]}/{func_name}{occurrence}",
             'match': func_match
         }
 
     return func_info_map
 
 
-def analyze_parameter_context(code_text, valid_matches):
+def analyze_parameter_context(code_text, valid_matches, parsed=None):
     """Analyze Hydra code context to generate TD-compliant parameter names"""
     param_info = []
 
@@ -265,13 +614,14 @@ def analyze_parameter_context(code_text, valid_matches):
     chain_names = ['', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
 
     # Preprocess code structure once for all parameters
-    func_info_map = preprocess_code_structure(code_text)
+    func_info_map = preprocess_code_structure(code_text, parsed)
 
     # Sort function positions once for binary search
     func_positions = sorted(func_info_map.keys())
 
     # Track parameter name usage to avoid duplicates
     param_name_counts = {}
+    anchor_counts = {}
 
     for i, (num_str, match_start, match_end) in enumerate(valid_matches):
         # Extract larger context around the number
@@ -283,6 +633,7 @@ def analyze_parameter_context(code_text, valid_matches):
         func_name = None
         param_index = 0
         chain_position = 0
+        anchor = 'value'
 
         # Find the nearest function call before this number using preprocessed map
         nearest_func_pos = None
@@ -307,10 +658,11 @@ def analyze_parameter_context(code_text, valid_matches):
         if nearest_func_info:
             func_name = nearest_func_info['name']
             chain_position = nearest_func_info['chain_position']
+            anchor = nearest_func_info['anchor']
             func_match = nearest_func_info['match']
 
             # Count commas between function start and our number to get parameter index
-            func_start = func_match.end()
+            func_start = func_match.end
             between_text = code_text[func_start:match_start]
             param_index = between_text.count(',')
 
@@ -365,6 +717,14 @@ def analyze_parameter_context(code_text, valid_matches):
         else:
             param_name_counts[param_name] = 1
 
+        # Structural identity - several numbers in one argument (3.14/4) get #1, #2...
+        anchor = f"{anchor}/{param_index}"
+        if anchor in anchor_counts:
+            anchor_counts[anchor] += 1
+            anchor = f"{anchor}#{anchor_counts[anchor] - 1}"
+        else:
+            anchor_counts[anchor] = 1
+
         # Mark if this is a color parameter (r, g, b from color/solid functions)
         is_color_param = False
         color_channel = None
@@ -380,7 +740,8 @@ def analyze_parameter_context(code_text, valid_matches):
             'param_index': param_index,
             'is_color_param': is_color_param,
             'color_channel': color_channel,
-            'chain_position': chain_position
+            'chain_position': chain_position,
+            'anchor': anchor
         })
 
     return param_info
@@ -442,7 +803,8 @@ def group_color_parameters(param_info):
                 'param_index': info['param_index'],
                 'is_rgb_group': True,
                 'color_params': color_group,  # Store the original r, g, b info
-                'num_channels': len(color_group)
+                'num_channels': len(color_group),
+                'anchor': info['anchor'].rsplit('/', 1)[0] + '/rgb'
             })
 
             i = j  # Skip past the color params we grouped
@@ -451,192 +813,893 @@ def group_color_parameters(param_info):
             grouped_info.append(info)
             i += 1
 
+    return unique_parameter_names(grouped_info)
+
+
+def unique_parameter_names(grouped_info):
+    """
+    Give every parameter a page name of its own.
+
+    Two .color() calls at the same chain position both come out as e.g.
+    Colorrgbfour; later ones get a letter suffix like duplicate floats do.
+    RGB groups also reserve their r, g, b component names, which TD checks
+    for conflicts too (a third Colorrgb must not become Colorrgbb).
+    """
+    used = set()
+    for info in grouped_info:
+        base_name = info['name']
+        is_rgb = info.get('is_rgb_group', False)
+        param_name = base_name
+        counter = 0
+        while param_name in used or (is_rgb and any(param_name + c in used for c in 'rgb')):
+            param_name = f"{base_name}{chr(ord('a') + counter)}"
+            counter += 1
+        if param_name != base_name:
+            info['name'] = param_name
+        used.add(param_name)
+        if is_rgb:
+            used.update(param_name + c for c in 'rgb')
     return grouped_info
 
 
-def ensure_parameters_with_context(param_info):
-    """Ensure we have parameters with intelligent names - ONLY CREATE NEW ONES"""
-    controller = op('/project1/hydra_system/direct_param_controller')
-    param_page = None
+# ===== PARAMETER PLAN CACHE =====
+
+class ParameterPlanCache:
+    """
+    LRU cache of parameter plans keyed by a hash of the scene text.
+
+    A plan is everything derived from the code alone (tokens, valid numbers,
+    parameter names, RGB groups), so switching back to a scene or re-running
+    sync/apply on unchanged code is a dictionary lookup. Evicts least recently
+    used plans beyond max_entries or once the cached scene text exceeds max_chars.
+    """
+
+    def __init__(self, max_entries=32, max_chars=2000000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._plans = OrderedDict()
+        self._chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Warm-up workers put plans while the main thread reads them
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(code_text):
+        return hashlib.blake2b(code_text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, code_text, count=True):
+        key = self.key(code_text)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            if count:
+                self.hits += 1
+            return plan
+
+    def put(self, code_text, plan):
+        key = self.key(code_text)
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return
+            self._plans[key] = plan
+            self._chars += len(code_text)
+
+            while self._plans and (len(self._plans) > self.max_entries or self._chars > self.max_chars):
+                _, evicted = self._plans.popitem(last=False)
+                self._chars -= len(evicted['code_text'])
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self._chars = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._plans),
+                'chars': self._chars,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+_plan_cache = ParameterPlanCache()
+
+
+def build_parameter_plan(code_text, parsed=None):
+    """
+    Run the code-only analysis stages: tokenize, name parameters, group RGB.
+    Pure Python - no TD API calls, so it is safe to run on a worker thread.
+
+    Args:
+        code_text: Scene code
+        parsed: Optional ParsedScene for code_text (e.g. from an incremental re-parse)
+
+    Returns:
+        Dict with 'code_text', 'parsed', 'valid_matches', 'param_info', 'grouped_param_info'
+    """
+    if parsed is None:
+        parsed = hydra_code_parser.parse_scene(code_text)
+    valid_matches = parsed.numbers
+    _profiler.mark('regex scan')
+    param_info = analyze_parameter_context(code_text, valid_matches, parsed)
+    _profiler.mark('context analysis')
+    grouped_param_info = group_color_parameters(param_info)
+    _profiler.mark('rgb grouping')
+
+    return {
+        'code_text': code_text,
+        'parsed': parsed,
+        'valid_matches': valid_matches,
+        'param_info': param_info,
+        'grouped_param_info': grouped_param_info
+    }
+
+
+def get_parameter_plan(code_text, previous_parsed=None):
+    """
+    Cached build_parameter_plan. Plans are shared between callers - treat as read-only.
+
+    Args:
+        code_text: Scene code
+        previous_parsed: ParsedScene of an earlier version, used for an incremental re-parse on a miss
+    """
+    plan = _plan_cache.get(code_text)
+    if plan is None:
+        parsed = hydra_code_parser.reparse_scene(previous_parsed, code_text)
+        plan = build_parameter_plan(code_text, parsed)
+        _plan_cache.put(code_text, plan)
+    else:
+        _profiler.mark('plan cache hit')
+    return plan
+
+
+def get_plan_cache_stats():
+    """Hit/miss counters for the parameter plan cache"""
+    return _plan_cache.stats()
+
+
+def print_plan_cache_stats():
+    """Print plan cache counters to the textport"""
+    stats = get_plan_cache_stats()
+    print(f"Plan cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries, "
+          f"{stats['evictions']} evictions")
+
+
+def clear_plan_cache():
+    """Drop all cached parameter plans"""
+    _plan_cache.clear()
+
+
+# ===== SCENE WARM-UP =====
+
+# Preset folders (relative to the project folder) whose scenes are warmed up too
+PRESET_FOLDERS = ['presets', 'presets/examples']
+WARM_UP_WORKERS = 4
+
+_warm_up_state = {
+    'executor': None,
+    'futures': [],
+    'scenes': 0     # Scene texts submitted by the last warm_up_plans call
+}
+
+
+def _collect_scene_texts(include_presets=True):
+    """
+    Scene code to warm up - runs on the main thread (TD API).
+
+    Returns:
+        (scene_texts, preset_files) - CodeManager scene texts, and preset JSON
+        paths for the workers to read
+    """
+    scene_texts = []
+    code_manager = op(CODE_MANAGER_PATH)
+    if code_manager:
+        for child in code_manager.children:
+            if re.match(r'scene\d+_code$', child.name) and hasattr(child, 'text'):
+                scene_texts.append(child.text)
+
+    preset_files = []
+    if include_presets:
+        try:
+            project_folder = project.folder
+        except NameError:
+            project_folder = None
+        for folder in PRESET_FOLDERS:
+            path = os.path.join(project_folder, folder) if project_folder else folder
+            if os.path.isdir(path):
+                preset_files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                                    if name.endswith('.json'))
+    return scene_texts, preset_files
+
+
+def _warm_plan(code_text):
+    """Worker: build and cache the plan for one scene text unless it is cached already"""
+    if not code_text.strip() or _plan_cache.get(code_text, count=False) is not None:
+        return False
+    _plan_cache.put(code_text, build_parameter_plan(code_text))
+    return True
+
+
+def _warm_preset(preset_file):
+    """Worker: warm every scene in a preset file"""
+    with open(preset_file, encoding='utf-8') as f:
+        preset = json.load(f)
+    return sum(_warm_plan(scene.get('code', '')) for scene in preset.get('scenes', {}).values())
+
+
+def warm_up_plans(include_presets=True, wait=False):
+    """
+    Pre-analyse every scene in CodeManager (and the preset folders) on a
+    thread pool, so switching to a scene finds its plan in the plan cache and
+    only does the TD-side parameter writes.
+
+    Scene texts are read here on the main thread; workers only run the
+    pure-Python stages (build_parameter_plan). Call from an Execute DAT's
+    onStart, or after loading a preset.
+
+    Args:
+        include_presets: Also warm the scenes stored in preset JSON files
+        wait: Block until all plans are built (for scripts and benchmarks)
+    """
+    scene_texts, preset_files = _collect_scene_texts(include_presets)
+
+    if _warm_up_state['executor'] is None:
+        _warm_up_state['executor'] = ThreadPoolExecutor(max_workers=WARM_UP_WORKERS,
+                                                        thread_name_prefix='hydra-warmup')
+    executor = _warm_up_state['executor']
+
+    # Presets first, CodeManager scenes last - the most likely switches stay
+    # most recently used if the plan cache has to evict
+    futures = [executor.submit(_warm_preset, path) for path in preset_files]
+    futures += [executor.submit(_warm_plan, text) for text in scene_texts]
+
+    _warm_up_state.update(futures=futures, scenes=len(scene_texts))
+    log(f"Warming up {len(scene_texts)} scenes and {len(preset_files)} presets")
+
+    if wait:
+        for future in futures:
+            future.exception()
+        stats = get_warm_up_stats()
+        print(f"Warm-up: {stats['built']} plans built, {stats['errors']} errors")
+
+
+def get_warm_up_stats():
+    """Progress of the last warm_up_plans call"""
+    futures = _warm_up_state['futures']
+    done = [future for future in futures if future.done()]
+    failed = [future for future in done if future.exception() is not None]
+    return {
+        'pending': len(futures) - len(done),
+        'scenes': _warm_up_state['scenes'],
+        'built': sum(int(future.result()) for future in done if future not in failed),
+        'errors': len(failed)
+    }
+
+
+# ===== PARAMETER PAGE RECONCILER =====
+
+PARAM_CONTROLLER_PATH = '/project1/hydra_system/direct_param_controller'
+PARAM_PAGE_NAME = 'HydraParams'
+
+# Counts from the last reconcile_parameters call
+_reconcile_stats = {'created': 0, 'removed': 0, 'kept': 0}
+
+
+def get_param_page(create=False):
+    """
+    The HydraParams page parameters live on (None if it doesn't exist and create is False).
+
+    The parameter controller's own page, or the active scene's parameter COMP
+    when PER_SCENE_PARAMS is on.
+    """
+    controller = get_param_owner(create=create) if PER_SCENE_PARAMS else op(PARAM_CONTROLLER_PATH)
+    if not controller:
+        if not PER_SCENE_PARAMS:
+            print(f"ERROR: Parameter controller not found at {PARAM_CONTROLLER_PATH}")
+        return None
+
     for page in controller.customPages:
-        if page.name == "HydraParams":
-            param_page = page
-            break
+        if page.name == PARAM_PAGE_NAME:
+            return page
 
-    if not param_page:
-        print("Creating HydraParams page...")
-        param_page = controller.appendCustomPage("HydraParams")
+    if not create:
+        return None
+    log("Creating HydraParams page...")
+    return controller.appendCustomPage(PARAM_PAGE_NAME)
+
+
+def index_param_page(param_page):
+    """
+    Exact name index of a parameter page in one pass.
 
-    # Get existing parameters (including RGB groups)
-    existing_params = {}
+    page.pars lists RGB parameters as their r, g, b components (Colorrgbr,
+    Colorrgbg, Colorrgbb); they are grouped back under their tuplet name.
+
+    Returns:
+        Dict of tuplet name -> Par, or a tuple of (r, g, b) Pars for RGB
+    """
+    tuplets = {}
     for par in param_page.pars:
-        if not par.name.startswith('_'):
-            # Handle RGB parameters (they come in tuples of r, g, b)
-            if hasattr(par, 'vecSize'):
-                # This is an RGB/vector parameter
-                existing_params[par.name] = par
-            else:
-                existing_params[par.name] = par
+        if par.name.startswith('_'):
+            continue
+        tuplets.setdefault(par.tupletName, []).append(par)
 
-    # Create new parameters ONLY if they don't exist
-    created_params = {}
-    created_count = 0
-    skipped_count = 0
+    index = {}
+    for tuplet_name, pars in tuplets.items():
+        if len(pars) == 1 and pars[0].name == tuplet_name:
+            index[tuplet_name] = pars[0]
+        else:
+            index[tuplet_name] = tuple(pars)
+    return index
 
-    for i, info in enumerate(param_info):
-        param_name = info['name']
-        label = info['label']
-        original_name = param_name
 
-        # Check if this is an RGB group
-        is_rgb_group = info.get('is_rgb_group', False)
+def _create_parameter(param_page, info):
+    """Append one float or RGB parameter with the -1000..1000 unclamped range"""
+    if info.get('is_rgb_group'):
+        new_param = param_page.appendRGB(info['name'], label=info['label'])
+        pars = (new_param[0], new_param[1], new_param[2])
+    else:
+        new_param = param_page.appendFloat(info['name'], label=info['label'])
+        pars = (new_param,)
 
-        # Check if this exact parameter already exists FIRST
-        if param_name in existing_params:
-            # Use the existing parameter - don't create new one
-            created_params[param_name] = existing_params[param_name]
-            skipped_count += 1
-            continue
+    for par in pars:
+        par.normMin = -1000
+        par.normMax = 1000
+        par.clampMin = False
+        par.clampMax = False
+    return pars if info.get('is_rgb_group') else pars[0]
 
-        # Handle name conflicts by adding letters ONLY for new parameters
-        counter = 0
-        while param_name in existing_params or param_name in created_params:
-            suffix_letter = chr(ord('a') + counter)
-            param_name = f"{original_name}{suffix_letter}"
-            counter += 1
 
+def reconcile_parameters(grouped_param_info, create=True, remove_unused=False):
+    """
+    Bring the HydraParams page in line with a parameter plan.
+
+    Diffs the plan against the page in one pass, then destroys what is stale
+    and creates what is missing. Plan names are unique (see
+    unique_parameter_names), so each plan entry maps to exactly one tuplet -
+    existing parameters keep their values and slider bindings.
+
+    Args:
+        grouped_param_info: Parameter plan entries (after RGB grouping)
+        create: Create missing parameters
+        remove_unused: Destroy parameters the plan doesn't use
+
+    Returns:
+        (param_page, params) - params maps plan name -> Par, or (r, g, b) Pars for RGB.
+        param_page is None if the page doesn't exist and create is False.
+    """
+    param_page = get_param_page(create=create)
+    if not param_page:
+        return None, {}
+
+    existing = index_param_page(param_page)
+
+    params = {}
+    to_create = []
+    to_destroy = []
+    for info in grouped_param_info:
+        param_name = info['name']
+        current = existing.get(param_name)
+        # A float where an RGB is wanted (or the other way round) is replaced
+        if current is not None and isinstance(current, tuple) == bool(info.get('is_rgb_group')):
+            params[param_name] = current
+            # A kept name may now sit at another chain position - relabel, don't recreate
+            label_par = current[0] if isinstance(current, tuple) else current
+            if create and label_par.label != info['label']:
+                label_par.label = info['label']
+        elif create:
+            if current is not None:
+                to_destroy.append((param_name, current))
+            to_create.append(info)
+        # Without create a mismatched parameter stays - destroying it would leave nothing
+
+    unused = set()
+    if remove_unused:
+        wanted = {info['name'] for info in grouped_param_info}
+        unused = {name for name in existing if name not in wanted}
+        to_destroy.extend((name, existing[name]) for name in unused)
+
+    # Destroy first so replaced names are free again
+    removed_count = 0
+    for param_name, current in to_destroy:
         try:
-            if is_rgb_group:
-                # Create RGB parameter
-                new_param = param_page.appendRGB(param_name, label=label)
-                # RGB parameters have r, g, b sub-parameters
-                for sub_par in [new_param[0], new_param[1], new_param[2]]:
-                    sub_par.normMin = -1000
-                    sub_par.normMax = 1000
-                    sub_par.clampMin = False
-                    sub_par.clampMax = False
-                created_params[param_name] = new_param
-                print(f"  Created RGB parameter: {param_name} ({label})")
-                created_count += 1
-            else:
-                # Create regular float parameter
-                new_param = param_page.appendFloat(param_name, label=label)
-                new_param.normMin = -1000
-                new_param.normMax = 1000
-                new_param.clampMin = False
-                new_param.clampMax = False
-                created_params[param_name] = new_param
-                print(f"  Created parameter: {param_name} ({label})")
-                created_count += 1
+            # Destroying one component removes the whole RGB tuplet
+            (current[0] if isinstance(current, tuple) else current).destroy()
+            log(f"  Removed: {param_name}")
+            removed_count += 1
         except Exception as e:
-            print(f"  Warning: Could not create parameter {param_name}: {e}")
-            # Fallback to generic name
-            fallback_name = f"Param{i + 1}"
+            unused.discard(param_name)
+            print(f"  Warning: Could not remove parameter {param_name}: {e}")
+
+    # Names of removed parameters are free for new anchors again
+    if unused:
+        get_param_id_table(param_page.owner.path).release(unused)
+
+    created_count = 0
+    if create:
+        for info in to_create:
             try:
-                new_param = param_page.appendFloat(fallback_name, label=f"Param {i + 1}")
-                new_param.normMin = -1000
-                new_param.normMax = 1000
-                new_param.clampMin = False
-                new_param.clampMax = False
-                created_params[fallback_name] = new_param
-                print(f"  Created fallback parameter: {fallback_name}")
+                params[info['name']] = _create_parameter(param_page, info)
+                log(f"  Created {'RGB ' if info.get('is_rgb_group') else ''}parameter: {info['name']} ({info['label']})")
                 created_count += 1
-            except Exception as e2:
-                print(f"  ERROR: Could not create fallback parameter: {e2}")
+            except Exception as e:
+                print(f"  Warning: Could not create parameter {info['name']}: {e}")
 
+    _reconcile_stats.update(created=created_count, removed=removed_count, kept=len(params) - created_count)
     if created_count > 0:
-        print(f"  Created {created_count} new parameters")
-    if skipped_count > 0:
-        print(f"  Skipped {skipped_count} existing parameters")
+        log(f"  Created {created_count} new parameters")
+    if removed_count > 0:
+        log(f"  Removed {removed_count} parameters")
+    if len(params) > created_count:
+        log(f"  Kept {len(params) - created_count} existing parameters")
+
+    return param_page, params
+
+
+def ensure_parameters_with_context(param_info):
+    """Ensure we have parameters with intelligent names - ONLY CREATE NEW ONES"""
+    return reconcile_parameters(param_info)
+
+
+# ===== PER-SCENE PARAMETER SETS =====
+
+# When on, each scene keeps its parameters on its own COMP under
+# SCENE_PARAMS_PATH. Switching scenes points the parameter view at that COMP
+# instead of destroying one scene's parameters and creating the next one's -
+# values and slider bindings of every scene stay alive.
+PER_SCENE_PARAMS = False
+
+SCENE_PARAMS_PATH = PARAM_CONTROLLER_PATH + '/scene_params'
+# Parameter COMP in the control panel showing the active scene's parameters
+PARAMS_VIEW_PATH = PARAM_CONTROLLER_PATH + '/params_view'
+# Controller storage key holding the active scene's parameter COMP path
+ACTIVE_PARAMS_KEY = 'hydra_active_params'
+# Parameter Execute DAT in SCENE_PARAMS_PATH forwarding slider changes of every scene COMP
+SCENE_PARAMS_CALLBACK = 'scene_params_exec'
+
+_SCENE_PARAMS_CALLBACK_TEXT = """# Created by manual_triggers - forwards slider changes of the scene parameter COMPs
+def onValueChange(par, prev):
+    parent(2).op('manual_triggers').module.on_scene_param_change(par)
+    return
+"""
+
+_scene_param_owners = {}   # scene DAT name -> parameter COMP
+
+
+def get_param_owner(scene_code=None, create=False):
+    """
+    The COMP holding a scene's parameters (active scene by default).
+
+    Args:
+        scene_code: Scene DAT, or None for the current scene
+        create: Create the COMP (and its container) if it doesn't exist
+    """
+    if scene_code is None:
+        scene_code = get_current_scene_code()
+        if not scene_code:
+            print("ERROR: No current scene code found")
+            return None
+
+    owner = _scene_param_owners.get(scene_code.name)
+    if owner is not None and owner.valid:
+        return owner
+
+    container = op(SCENE_PARAMS_PATH)
+    if not container:
+        controller = op(PARAM_CONTROLLER_PATH)
+        if not controller or not create:
+            return None
+        container = controller.create(baseCOMP, SCENE_PARAMS_PATH.rsplit('/', 1)[-1])
+
+    owner = container.op(scene_code.name)
+    if not owner:
+        if not create:
+            return None
+        owner = container.create(baseCOMP, scene_code.name)
+        log(f"Created parameter set for {scene_code.name}")
+    _scene_param_owners[scene_code.name] = owner
+    return owner
+
+
+def _attach_scene_params_callback(container):
+    """
+    Create the Parameter Execute DAT that sends slider changes of every scene
+    COMP in container to on_scene_param_change (once per container)
+    """
+    if container.op(SCENE_PARAMS_CALLBACK):
+        return
+    callback = container.create(parameterexecuteDAT, SCENE_PARAMS_CALLBACK)
+    callback.text = _SCENE_PARAMS_CALLBACK_TEXT
+    callback.par.op = '*'
+    callback.par.pars = '*'
+    callback.par.custom = True
+    callback.par.builtin = False
+    callback.par.valuechange = True
+    log(f"Created parameter callback {callback.path}")
+
+
+def on_scene_param_change(par):
+    """Parameter Execute body for the scene COMPs - applies changes of the active scene's sliders"""
+    if not PER_SCENE_PARAMS:
+        return
+    owner = get_param_owner()
+    if owner is not None and par.owner == owner:
+        request_apply()
+
+
+def on_scene_registry_change():
+    """
+    DAT Execute body for scene_registry (installed by install_fixed_triggers):
+    drops the cached scene and DAT chains and, in per-scene mode, shows the
+    new scene's parameters
+    """
+    invalidate_scene_cache()
+    # Select indices may follow the registry through expressions, which no callback sees
+    invalidate_source_graph()
+    if PER_SCENE_PARAMS:
+        switch_scene_params()
+
+
+def _show_param_owner(owner):
+    """Point the parameter view (and the controller's storage) at owner"""
+    _attach_scene_params_callback(owner.parent())
+    view = op(PARAMS_VIEW_PATH)
+    if view and hasattr(view.par, 'op'):
+        view.par.op = owner.path
+    controller = op(PARAM_CONTROLLER_PATH)
+    if controller:
+        controller.store(ACTIVE_PARAMS_KEY, owner.path)
+
+
+def switch_scene_params():
+    """
+    Show the current scene's parameters - call when the active scene changes.
+
+    A scene seen before keeps its parameter COMP, so this is a view flip with
+    no parameters created, destroyed or written. A scene seen for the first
+    time gets its COMP and one sync.
+    """
+    if not PER_SCENE_PARAMS:
+        cleanup_and_sync()
+        return
+
+    scene_code = get_current_scene_code()
+    if not scene_code:
+        print("ERROR: No current scene code found")
+        return
+
+    owner = get_param_owner(scene_code)
+    if owner is None:
+        owner = get_param_owner(scene_code, create=True)
+        if owner is None:
+            print(f"ERROR: Could not create a parameter set under {SCENE_PARAMS_PATH}")
+            return
+        _show_param_owner(owner)
+        sync_now()
+        return
+
+    _show_param_owner(owner)
+    log(f"Showing parameters of {scene_code.name}")
+
+
+def drop_scene_params(scene_name=None):
+    """Destroy the parameter COMP of one scene (e.g. 'scene2_code'), or of every scene"""
+    container = op(SCENE_PARAMS_PATH)
+    if not container:
+        return
+    for owner in list(container.children):
+        if owner.name == SCENE_PARAMS_CALLBACK:
+            continue
+        if scene_name is None or owner.name == scene_name:
+            _scene_param_owners.pop(owner.name, None)
+            get_param_id_table(owner.path).reset()
+            owner.destroy()
+
+
+def enable_per_scene_params(enabled=True):
+    """Switch per-scene parameter sets on or off"""
+    global PER_SCENE_PARAMS
+    PER_SCENE_PARAMS = enabled
+    _scene_param_owners.clear()
+    print(f"\n=== PER-SCENE PARAMETERS {'ON' if enabled else 'OFF'} ===")
+    if enabled:
+        switch_scene_params()
+
+
+# ===== STABLE PARAMETER NAMES =====
+
+# Controller storage key for the anchor -> page name tables (saved with the .toe):
+# {owner path: {anchor: page name}}, one table per COMP parameters live on
+PARAM_IDS_KEY = 'hydra_param_ids'
+
+
+def _load_param_id_store():
+    controller = op(PARAM_CONTROLLER_PATH)
+    stored = controller.fetch(PARAM_IDS_KEY, None, search=False) if controller else None
+    if not stored:
+        return {}
+    return {owner: dict(names) for owner, names in stored.items()}
+
 
-    return param_page, created_params
+def _save_param_id_table(owner_path, names):
+    controller = op(PARAM_CONTROLLER_PATH)
+    if not controller:
+        return
+    store = _load_param_id_store()
+    if names:
+        store[owner_path] = dict(names)
+    else:
+        store.pop(owner_path, None)
+    controller.store(PARAM_IDS_KEY, store)
+
+
+class ParameterIdTable:
+    """
+    Persisted mapping from parameter anchors to page names, for one parameter owner.
+
+    Generated names depend on chain position and duplicate counters, so
+    inserting a .rotate() mid-chain would rename every later parameter and
+    cleanup would destroy and recreate them. An anchor names a parameter by
+    structure instead (see preprocess_code_structure); the first name an
+    anchor gets is kept while its parameter exists. Only anchors that
+    genuinely appear get new parameters.
+
+    A page name belongs to one anchor. A new anchor whose generated name is
+    already owned gets a letter suffix, like duplicate names in a scene.
+    reconcile_parameters releases the anchors of the parameters it removes,
+    so names of deleted chains are free again.
+    """
+
+    def __init__(self, owner_path):
+        self.owner_path = owner_path
+        self.names = None     # anchor -> page name, loaded on first use
+        self.owners = {}      # page name (and r, g, b component names) -> anchor
+        self.version = 0
+        self._last = None     # (plan, version, named param info)
+
+    @staticmethod
+    def _par_names(name, is_rgb):
+        return [name] + [name + c for c in 'rgb'] if is_rgb else [name]
+
+    def _load(self):
+        self.names = {}
+        self.owners = {}
+        for anchor, name in _load_param_id_store().get(self.owner_path, {}).items():
+            self._claim(anchor, name, anchor.endswith('/rgb'))
+
+    def _save(self):
+        _save_param_id_table(self.owner_path, self.names)
+
+    def _claim(self, anchor, name, is_rgb):
+        old_name = self.names.get(anchor)
+        if old_name is not None:
+            self._unclaim(anchor, old_name, is_rgb)
+        self.names[anchor] = name
+        for par_name in self._par_names(name, is_rgb):
+            self.owners[par_name] = anchor
+
+    def _unclaim(self, anchor, name, is_rgb):
+        for par_name in self._par_names(name, is_rgb):
+            if self.owners.get(par_name) == anchor:
+                del self.owners[par_name]
+
+    def _taken(self, name, anchor, used, is_rgb):
+        """True if name (or its r, g, b components) is used in this scene or owned by another anchor"""
+        for par_name in self._par_names(name, is_rgb):
+            if par_name in used or self.owners.get(par_name, anchor) != anchor:
+                return True
+        return False
+
+    def named_info(self, plan):
+        """
+        The plan's grouped parameter info with page names from the table.
+
+        Returns a new list (plans are shared); assigns and saves names for
+        anchors seen for the first time.
+        """
+        if self.names is None:
+            self._load()
+        if self._last is not None and self._last[0] is plan and self._last[1] == self.version:
+            return self._last[2]
+
+        named = []
+        used = set()
+        changed = False
+        for info in plan['grouped_param_info']:
+            anchor = info['anchor']
+            is_rgb = info.get('is_rgb_group', False)
+            param_name = self.names.get(anchor)
+
+            if param_name is None or self._taken(param_name, anchor, used, is_rgb):
+                base_name = info['name']
+                param_name = base_name
+                counter = 0
+                while self._taken(param_name, anchor, used, is_rgb):
+                    param_name = f"{base_name}{chr(ord('a') + counter)}"
+                    counter += 1
+                self._claim(anchor, param_name, is_rgb)
+                changed = True
+
+            used.update(self._par_names(param_name, is_rgb))
+            named.append(info if info['name'] == param_name else dict(info, name=param_name))
+
+        if changed:
+            self.version += 1
+            self._save()
+        self._last = (plan, self.version, named)
+        return named
+
+    def release(self, param_names):
+        """Forget the anchors of page names whose parameters were removed"""
+        if self.names is None:
+            self._load()
+        released = [(anchor, name) for anchor, name in self.names.items() if name in param_names]
+        for anchor, name in released:
+            self._unclaim(anchor, name, anchor.endswith('/rgb'))
+            del self.names[anchor]
+        if released:
+            self.version += 1
+            self._save()
+        return len(released)
+
+    def reset(self):
+        self.names = {}
+        self.owners = {}
+        self.version += 1
+        self._last = None
+        self._save()
+
+
+_param_id_tables = {}   # owner path -> ParameterIdTable
+
+
+def _param_owner_path():
+    """Path of the COMP the current scene's parameters live on (it may not exist yet)"""
+    if PER_SCENE_PARAMS:
+        scene_code = get_current_scene_code()
+        if scene_code:
+            return f"{SCENE_PARAMS_PATH}/{scene_code.name}"
+    return PARAM_CONTROLLER_PATH
+
+
+def get_param_id_table(owner_path=None):
+    """The anchor table of a parameter owner (the current scene's by default)"""
+    owner_path = owner_path or _param_owner_path()
+    table = _param_id_tables.get(owner_path)
+    if table is None:
+        table = _param_id_tables[owner_path] = ParameterIdTable(owner_path)
+    return table
+
+
+def stable_param_info(plan):
+    """Grouped parameter info for a plan, named by the current owner's persisted anchor table"""
+    return get_param_id_table().named_info(plan)
+
+
+def get_parameter_ids(owner_path=None):
+    """The anchor -> page name table, e.g. {'osc0/kaleid0/0': 'Kaleidnsidesthree'}"""
+    table = get_param_id_table(owner_path)
+    if table.names is None:
+        table._load()
+    return dict(table.names)
+
+
+def reset_parameter_ids(owner_path=None):
+    """Forget the anchors of one owner, or of every owner - the next sync names parameters from scratch"""
+    if owner_path is not None:
+        get_param_id_table(owner_path).reset()
+        return
+    for table in _param_id_tables.values():
+        table.reset()
+    _param_id_tables.clear()
+    controller = op(PARAM_CONTROLLER_PATH)
+    if controller:
+        controller.store(PARAM_IDS_KEY, {})
+
+
+# ===== INCREMENTAL SYNC STATE =====
+
+# Last analysed ParsedScene per scene DAT path - lets sync_now re-parse only the edited chains
+_last_parsed = {}
+
+
+def reset_sync_state():
+    """Forget the last analysed scenes so the next sync does a full re-parse"""
+    _last_parsed.clear()
 
 
-def sync_now():
-    """SYNC: Read values from current scene and update parameter sliders - FAST VERSION"""
-    print("\n=== SYNCING FROM CURRENT SCENE (FAST) ===")
+def _ensure_wide_range(par):
+    """Set the -1000..1000 unclamped range, writing only attributes that differ"""
+    written = False
+    if par.normMin != -1000:
+        par.normMin = -1000
+        written = True
+    if par.normMax != 1000:
+        par.normMax = 1000
+        written = True
+    if par.clampMin:
+        par.clampMin = False
+        written = True
+    if par.clampMax:
+        par.clampMax = False
+        written = True
+    return written
+
+
+@profiled('sync_now')
+def sync_now(incremental=True):
+    """
+    SYNC: Read values from current scene and update parameter sliders - FAST VERSION
+
+    Args:
+        incremental: Re-parse only the chains changed since the last sync of this
+                     scene and write only parameters whose value differs.
+                     False forces a full re-parse and rewrites every parameter.
+    """
+    log("\n=== SYNCING FROM CURRENT SCENE (FAST) ===")
 
     # Get current scene code dynamically
     scene_code = get_current_scene_code()
+    _profiler.mark('scene lookup')
     if not scene_code:
         print("ERROR: No current scene code found")
         return
 
-    print(f"Using scene: {scene_code.path}")
+    log(f"Using scene: {scene_code.path}")
 
     # Extract numbers with simple regex (including negatives)
     code_text = scene_code.text
-    print(f"Scene code: {repr(code_text[:100] + '...' if len(code_text) > 100 else code_text)}")
-
-    # Find all numbers, including negatives
-    pattern = r'-?\d+\.?\d*|-?\.\d+'
-    all_matches = list(re.finditer(pattern, code_text))
-
-    # Find all {{...}} blocks to skip numbers inside them
-    brace_blocks = list(re.finditer(r'\{\{[^}]*\}\}', code_text))
-    brace_ranges = [(b.start(), b.end()) for b in brace_blocks]
-
-    # Find all arrow function blocks to skip numbers inside them
-    # Match: () => ...) or (x) => ...) including nested parentheses
-    arrow_pattern = r'\([^)]*\)\s*=>\s*[^,)]*'
-    arrow_blocks = list(re.finditer(arrow_pattern, code_text))
-    arrow_ranges = [(a.start(), a.end()) for a in arrow_blocks]
-
-    # Filter out {{null references, time, Math.*, arrow functions, etc
-    valid_matches = []
-    for match in all_matches:
-        start_pos = match.start()
-        end_pos = match.end()
-
-        # Check if this number is inside any {{...}} block
-        inside_braces = any(block_start <= start_pos < block_end
-                          for block_start, block_end in brace_ranges)
-
-        # Check if this number is inside any arrow function
-        inside_arrow = any(arrow_start <= start_pos < arrow_end
-                         for arrow_start, arrow_end in arrow_ranges)
-
-        # Check for special patterns in preceding text
-        preceding_text = code_text[max(0, start_pos-30):start_pos]
-        has_skip_pattern = any(skip_pattern in preceding_text for skip_pattern in [
-            'time', 'Math.', 'PI', 'frame', 'width', 'height', '=>'
-        ])
-
-        # Skip if inside braces, arrow function, or has special pattern
-        if inside_braces or inside_arrow or has_skip_pattern:
-            continue
-
-        valid_matches.append((match.group(), match.start(), match.end()))
+    log(f"Scene code: {repr(code_text[:100] + '...' if len(code_text) > 100 else code_text)}")
 
-    print(f"Found {len(valid_matches)} valid numbers: {[m[0] for m in valid_matches[:10]]}{'...' if len(valid_matches) > 10 else ''}")
+    # Tokenize once - {{...}} refs, arrow functions, time/Math.* etc are already filtered out
+    if incremental:
+        plan = get_parameter_plan(code_text, _last_parsed.get(scene_code.path))
+    else:
+        plan = build_parameter_plan(code_text)
+    parsed = plan['parsed']
+    _last_parsed[scene_code.path] = parsed
+    if parsed.edit:
+        edit_start, old_end, new_end = parsed.edit
+        log(f"Incremental re-parse: edit at chars {edit_start}-{new_end} (was {edit_start}-{old_end})")
+    valid_matches = plan['valid_matches']
 
-    # Analyze context to generate intelligent parameter names (LIGHTWEIGHT)
-    param_info = analyze_parameter_context(code_text, valid_matches)
+    log(f"Found {len(valid_matches)} valid numbers: {[m[0] for m in valid_matches[:10]]}{'...' if len(valid_matches) > 10 else ''}")
 
-    # Group color parameters into RGB groups
-    grouped_param_info = group_color_parameters(param_info)
+    # Intelligent parameter names and RGB groups come with the plan,
+    # page names are kept stable across edits by the anchor table
+    grouped_param_info = stable_param_info(plan)
 
     # Ensure we have parameters with intelligent names (ONLY CREATE NEW ONES)
     param_page, created_params = ensure_parameters_with_context(grouped_param_info)
+    _profiler.mark('parameter creation')
     if not param_page:
         return
 
     # Update parameter values (FAST - just set values)
     # Need to map valid_matches to grouped_param_info
     synced_count = 0
+    unchanged_count = 0
     value_index = 0  # Track position in valid_matches
 
     for info in grouped_param_info:
         param_name = info['name']
 
-        # Find the actual parameter (might have had letter appended for uniqueness)
-        actual_param = None
-        actual_param_name = None
-        for created_name, param in created_params.items():
-            if created_name == param_name or created_name.startswith(param_name):
-                actual_param = param
-                actual_param_name = created_name
-                break
+        # Plan names are the page names - exact lookup
+        actual_param = created_params.get(param_name)
+        actual_param_name = param_name
 
         if actual_param is not None:
             try:
@@ -667,11 +1730,15 @@ def sync_now():
                     old_g = actual_param[1].val
                     old_b = actual_param[2].val
 
+                    if incremental and (old_r, old_g, old_b) == (r_val, g_val, b_val):
+                        unchanged_count += 1
+                        continue
+
                     actual_param[0].val = r_val
                     actual_param[1].val = g_val
                     actual_param[2].val = b_val
 
-                    print(f"  {actual_param_name}: ({old_r}, {old_g}, {old_b}) -> ({r_val}, {g_val}, {b_val}) [{info['label']}]")
+                    log(f"  {actual_param_name}: ({old_r}, {old_g}, {old_b}) -> ({r_val}, {g_val}, {b_val}) [{info['label']}]")
                     synced_count += 1
                 else:
                     # Regular float parameter
@@ -679,18 +1746,25 @@ def sync_now():
                         num_str = valid_matches[value_index][0]
                         old_val = actual_param.val
                         new_val = float(num_str)
+                        value_index += 1
 
                         # Always set wide range and disable clamping for ALL parameters
                         if hasattr(actual_param, 'normMin') and hasattr(actual_param, 'normMax'):
-                            actual_param.normMin = -1000
-                            actual_param.normMax = 1000
-                            actual_param.clampMin = False
-                            actual_param.clampMax = False
+                            if incremental:
+                                _ensure_wide_range(actual_param)
+                            else:
+                                actual_param.normMin = -1000
+                                actual_param.normMax = 1000
+                                actual_param.clampMin = False
+                                actual_param.clampMax = False
+
+                        if incremental and old_val == new_val:
+                            unchanged_count += 1
+                            continue
 
                         actual_param.val = new_val
-                        print(f"  {actual_param_name}: {old_val} -> {new_val} [{info['label']}]")
+                        log(f"  {actual_param_name}: {old_val} -> {new_val} [{info['label']}]")
                         synced_count += 1
-                        value_index += 1
             except Exception as e:
                 print(f"  ERROR updating {param_name}: {e}")
                 import traceback
@@ -703,12 +1777,70 @@ def sync_now():
             else:
                 value_index += 1
 
+    _profiler.mark('value writes')
+    if unchanged_count > 0:
+        log(f"  {unchanged_count} parameters already up to date")
     print(f"SUCCESS: Synced {synced_count} parameters from current scene")
 
+    if LIVE_PARAMS_MODE:
+        send_live_code(plan, created_params)
+
+
+# ===== APPLY PRECISION =====
+
+# Decimal places apply_now writes into the code unless a parameter overrides it
+APPLY_DECIMALS = 3
+
+_param_precision = {}   # parameter name -> (decimals, step)
+
+# Slider value per position at the last apply, and the scene text it left behind
+_apply_memory = {'code_text': None, 'values': {}, 'skipped': 0}
+
+
+def set_param_precision(param_name, decimals=None, step=None):
+    """
+    Per-parameter precision for apply_now.
+
+    Args:
+        param_name: Parameter name, e.g. 'Oscfrequency' (RGB groups by group name)
+        decimals: Decimal places written into the code (default APPLY_DECIMALS)
+        step: Quantization step - values snap to multiples of step, and a slider
+              less than half a step from the literal in the code is left alone
+              (MIDI fader jitter). Both None resets the parameter.
+    """
+    if decimals is None and step is None:
+        _param_precision.pop(param_name, None)
+    else:
+        _param_precision[param_name] = (APPLY_DECIMALS if decimals is None else decimals, step)
+    # The literals may now be written differently
+    _apply_memory['code_text'] = None
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_value(value, decimals):
+    if abs(value - round(value)) < 10 ** -decimals:
+        return str(int(round(value)))
+    return "{:.{}f}".format(value, decimals).rstrip('0').rstrip('.')
 
+
+@functools.lru_cache(maxsize=4096)
+def _literal_value(num_str):
+    return float(num_str)
+
+
+def format_param_value(value, decimals=APPLY_DECIMALS):
+    """Format a parameter value for Hydra code - integers without decimals, else up to 3 places"""
+    return _format_value(float(value), decimals)
+
+
+def _quantize(value, step):
+    return round(value / step) * step if step else value
+
+
+@profiled('apply_now')
 def apply_now():
     """APPLY: Write parameter slider values to current scene"""
-    print("\n=== APPLYING TO CURRENT SCENE ===")
+    log("\n=== APPLYING TO CURRENT SCENE ===")
 
     # Get current scene code dynamically
     scene_code = get_current_scene_code()
@@ -716,112 +1848,58 @@ def apply_now():
         print("ERROR: No current scene code found")
         return
 
-    # Trace to find the original source DAT
-    source_dat = trace_to_source_dat(scene_code)
+    # Trace to find the original source DAT - the same entry gives the write targets below
+    source_entry = get_source_entry(scene_code)
+    source_dat = source_entry['source']
+    _profiler.mark('scene lookup')
 
-    print(f"Reading code from: {scene_code.path}")
+    log(f"Reading code from: {scene_code.path}")
     if source_dat != scene_code:
-        print(f"Will write changes to: {source_dat.path} (original source)")
+        log(f"Will write changes to: {source_dat.path} (original source)")
     else:
-        print(f"Will write changes to: {scene_code.path} (same as read location)")
+        log(f"Will write changes to: {scene_code.path} (same as read location)")
 
     # Get parameter page
-    controller = op('/project1/hydra_system/direct_param_controller')
-    param_page = None
-    for page in controller.customPages:
-        if page.name == "HydraParams":
-            param_page = page
-            break
-
+    param_page = get_param_page()
     if not param_page:
         print("ERROR: HydraParams page not found")
         return
 
     # Get parameter values by NAME (not index) for proper matching
     param_values_by_name = {}
-    for par in param_page.pars:
-        if not par.name.startswith('_'):
-            # Check if this is an RGB parameter
-            if hasattr(par, 'vecSize') and par.vecSize == 3:
-                # Store RGB values separately for expansion
-                param_values_by_name[par.name] = {
-                    'type': 'rgb',
-                    'r': par[0].val,
-                    'g': par[1].val,
-                    'b': par[2].val
-                }
-            else:
-                param_values_by_name[par.name] = {
-                    'type': 'single',
-                    'value': par.val
-                }
+    for param_name, par in index_param_page(param_page).items():
+        if isinstance(par, tuple):
+            # RGB parameter - store r, g, b separately for expansion
+            param_values_by_name[param_name] = {
+                'type': 'rgb',
+                'r': par[0].val,
+                'g': par[1].val if len(par) > 1 else 0.0,
+                'b': par[2].val if len(par) > 2 else 0.0
+            }
+        else:
+            param_values_by_name[param_name] = {
+                'type': 'single',
+                'value': par.val
+            }
 
-    print(f"Loaded {len(param_values_by_name)} parameters by name")
+    log(f"Loaded {len(param_values_by_name)} parameters by name")
 
     # Get original code and find replacement positions
     original_code = scene_code.text
-    print(f"Original code: {repr(original_code[:100] + '...' if len(original_code) > 100 else original_code)}")
-
-    # Find all numbers including negatives
-    pattern = r'-?\d+\.?\d*|-?\.\d+'
-    all_matches = list(re.finditer(pattern, original_code))
-
-    # Find all {{...}} blocks to skip numbers inside them
-    brace_blocks = list(re.finditer(r'\{\{[^}]*\}\}', original_code))
-    brace_ranges = [(b.start(), b.end()) for b in brace_blocks]
-
-    # Find all arrow function blocks to skip numbers inside them
-    arrow_pattern = r'\([^)]*\)\s*=>\s*[^,)]*'
-    arrow_blocks = list(re.finditer(arrow_pattern, original_code))
-    arrow_ranges = [(a.start(), a.end()) for a in arrow_blocks]
-
-    # Filter out {{null references and special patterns
-    valid_matches = []
-    for match in all_matches:
-        start_pos = match.start()
-        end_pos = match.end()
-
-        # Check if this number is inside any {{...}} block
-        inside_braces = any(block_start <= start_pos < block_end
-                          for block_start, block_end in brace_ranges)
-
-        # Check if this number is inside any arrow function
-        inside_arrow = any(arrow_start <= start_pos < arrow_end
-                         for arrow_start, arrow_end in arrow_ranges)
-
-        # Check for special patterns in preceding text
-        preceding_text = original_code[max(0, start_pos-30):start_pos]
-        has_skip_pattern = any(skip_pattern in preceding_text for skip_pattern in [
-            'time', 'Math.', 'PI', 'frame', 'width', 'height', '=>'
-        ])
-
-        # Skip if inside braces, arrow function, or has special pattern
-        if inside_braces or inside_arrow or has_skip_pattern:
-            continue
+    log(f"Original code: {repr(original_code[:100] + '...' if len(original_code) > 100 else original_code)}")
 
-        valid_matches.append(match)
+    # Same cached plan as sync_now - parameter names per position, RGB groups
+    plan = get_parameter_plan(original_code)
+    valid_matches = plan['valid_matches']
+    grouped_param_info = stable_param_info(plan)
 
-    print(f"Found {len(valid_matches)} valid replacement positions")
-
-    # Convert match objects to tuples for analyze_parameter_context
-    valid_match_tuples = []
-    for match in valid_matches:
-        num_str = match.group()
-        match_start = match.start()
-        match_end = match.end()
-        valid_match_tuples.append((num_str, match_start, match_end))
-
-    # Analyze context to get parameter info for each position
-    # This uses the same logic as sync_now to match parameters by name
-    param_info = analyze_parameter_context(original_code, valid_match_tuples)
-
-    # Group color parameters into RGB groups (same as sync_now)
-    grouped_param_info = group_color_parameters(param_info)
+    log(f"Found {len(valid_matches)} valid replacement positions")
 
     # Map each position to its parameter value
     # Need to expand RGB groups back to individual r, g, b values
-    print("\nMapping positions to parameters:")
+    log("\nMapping positions to parameters:")
     position_to_value = {}
+    position_names = {}
     value_index = 0
 
     for info in grouped_param_info:
@@ -836,18 +1914,21 @@ def apply_now():
                 # Map r, g, b values to consecutive positions
                 if num_channels >= 1:
                     position_to_value[value_index] = param_data['r']
-                    print(f"  Position {value_index}: {param_name}.r = {param_data['r']}")
+                    position_names[value_index] = param_name
+                    log(f"  Position {value_index}: {param_name}.r = {param_data['r']}")
                     value_index += 1
                 if num_channels >= 2:
                     position_to_value[value_index] = param_data['g']
-                    print(f"  Position {value_index}: {param_name}.g = {param_data['g']}")
+                    position_names[value_index] = param_name
+                    log(f"  Position {value_index}: {param_name}.g = {param_data['g']}")
                     value_index += 1
                 if num_channels >= 3:
                     position_to_value[value_index] = param_data['b']
-                    print(f"  Position {value_index}: {param_name}.b = {param_data['b']}")
+                    position_names[value_index] = param_name
+                    log(f"  Position {value_index}: {param_name}.b = {param_data['b']}")
                     value_index += 1
             else:
-                print(f"  RGB group {param_name} NOT FOUND in parameters")
+                log(f"  RGB group {param_name} NOT FOUND in parameters")
                 value_index += info['num_channels']
         else:
             # Regular parameter
@@ -856,102 +1937,91 @@ def apply_now():
             if param_name in param_values_by_name:
                 param_data = param_values_by_name[param_name]
                 position_to_value[value_index] = param_data['value']
-                print(f"  Position {value_index}: {param_name} = {param_data['value']}")
+                position_names[value_index] = param_name
+                log(f"  Position {value_index}: {param_name} = {param_data['value']}")
             else:
-                print(f"  Position {value_index}: {param_name} NOT FOUND in parameters")
+                log(f"  Position {value_index}: {param_name} NOT FOUND in parameters")
 
             value_index += 1
 
-    # Replace from end to start to preserve positions
-    print("\nApplying changes:")
-    new_code = original_code
-    applied_count = 0
-    for i in reversed(range(len(valid_matches))):
+    # Sliders that haven't moved since the last apply of this same text are done already
+    if _apply_memory['code_text'] == original_code:
+        last_values = _apply_memory['values']
+    else:
+        last_values = {}
+
+    # Collect replacements in code order, then splice them in one pass
+    log("\nApplying changes:")
+    replacements = []
+    unmoved_count = 0
+    for i in range(len(valid_matches)):
         if i in position_to_value:
-            match = valid_matches[i]
-            new_value = position_to_value[i]
+            value = position_to_value[i]
+            if last_values.get(i) == value:
+                unmoved_count += 1
+                continue
 
-            # Format number nicely
-            if abs(new_value - round(new_value)) < 0.001:
-                new_value_str = str(int(round(new_value)))
-            else:
-                new_value_str = "{:.3f}".format(new_value).rstrip('0').rstrip('.')
+            num_str, match_start, match_end = valid_matches[i]
+            decimals, step = _param_precision.get(position_names[i], (APPLY_DECIMALS, None))
+            if step and abs(value - _literal_value(num_str)) < step / 2:
+                # Jitter below half a step - keep the literal
+                continue
+            new_value_str = _format_value(float(_quantize(value, step)), decimals)
+
+            # Leave literals that already hold this value untouched (keeps '0.50', '1.' etc as written)
+            if _literal_value(num_str) == _literal_value(new_value_str):
+                continue
+            # x-1 -> x-(-0.5), not the decrement x--0.5
+            if new_value_str[0] == '-' and match_start > 0 and original_code[match_start - 1] in '+-':
+                new_value_str = f"({new_value_str})"
+
+            replacements.append((match_start, match_end, new_value_str))
+            log(f"  Position {i}: '{num_str}' -> '{new_value_str}'")
+
+    _apply_memory['skipped'] += unmoved_count
+    _profiler.mark('value writes')
+    applied_count = len(replacements)
+    if applied_count == 0:
+        _apply_memory.update(code_text=original_code, values=position_to_value)
+        # Writing the DAT would re-cook the whole Web Render chain for nothing
+        log("No changes - code already matches parameters")
+        return
 
-            old_value = match.group()
-            new_code = new_code[:match.start()] + new_value_str + new_code[match.end():]
-            print(f"  Position {i}: '{old_value}' -> '{new_value_str}'")
-            applied_count += 1
+    new_code = hydra_code_parser.splice(original_code, replacements)
 
     # Update scene - try to write to the best DAT in the chain
-    # Priority: SceneCodeSender > SceneCode > traced source > scene_code
+    # Priority: SceneCode > SceneCodeSender > other textDATs (see SourceGraph)
     write_success = False
-    dats_to_try = []
+    dats_to_try = source_entry['targets']
 
-    # Walk backwards from source_dat to find all DATs in chain
-    current = scene_code
-    chain_dats = []
-    visited = set()
+    if VERBOSE:
+        log(f"\nCollected {len(source_entry['chain'])} DATs in chain:")
+        for dat in source_entry['chain']:
+            tags_str = f" (tags: {', '.join(dat.tags)})" if dat.tags else ""
+            log(f"  - {dat.path} [{dat.OPType}]{tags_str}")
 
-    def collect_chain(dat):
-        """Collect all DATs in the input chain"""
-        if not dat or dat.path in visited:
-            return
-        visited.add(dat.path)
-        chain_dats.append(dat)
-
-        # For selectDAT, always check the dat parameter first
-        if dat.OPType == 'selectDAT' and hasattr(dat.par, 'dat'):
-            dat_path = dat.par.dat.eval()
-            if dat_path:
-                next_dat = op(dat_path)
-                if next_dat:
-                    collect_chain(next_dat)
-                    return
-
-        # Follow inputs for other DAT types
-        if dat.inputs and len(dat.inputs) > 0:
-            input_dat = dat.inputs[0]
-            if input_dat:
-                collect_chain(input_dat)
-
-    collect_chain(scene_code)
-
-    print(f"\nCollected {len(chain_dats)} DATs in chain:")
-    for dat in chain_dats:
-        tags_str = f" (tags: {', '.join(dat.tags)})" if dat.tags else ""
-        print(f"  - {dat.path} [{dat.OPType}]{tags_str}")
-
-    # Prioritize SceneCode tagged DATs (no inputs = original source)
-    for dat in chain_dats:
-        if 'SceneCode' in dat.tags:
-            dats_to_try.append(dat)
-
-    # Then try SceneCodeSender tagged DATs
-    for dat in chain_dats:
-        if 'SceneCodeSender' in dat.tags and dat not in dats_to_try:
-            dats_to_try.append(dat)
-
-    # Then try any other DATs in chain
-    for dat in chain_dats:
-        if dat not in dats_to_try and dat.OPType == 'textDAT':
-            dats_to_try.append(dat)
-
-    print(f"\nTrying to write in priority order:")
+    log(f"\nTrying to write in priority order:")
 
     # Try writing to each DAT in priority order
     for dat_to_write in dats_to_try:
-        print(f"  Attempting: {dat_to_write.path}")
+        log(f"  Attempting: {dat_to_write.path}")
         try:
             # Check if DAT is locked and try to unlock
             if hasattr(dat_to_write.par, 'locked') and dat_to_write.par.locked.eval():
-                print(f"    Unlocking...")
+                log(f"    Unlocking...")
                 dat_to_write.par.locked = False
 
             # Check if DAT has file sync enabled and disable it
             if hasattr(dat_to_write.par, 'syncfile') and dat_to_write.par.syncfile.eval():
-                print(f"    Disabling file sync...")
+                log(f"    Disabling file sync...")
                 dat_to_write.par.syncfile = False
 
+            # Source may already hold this code (e.g. written by a previous apply)
+            if dat_to_write.text == new_code:
+                print(f"  ✓ Already up to date: {dat_to_write.path}")
+                write_success = True
+                break
+
             # Try to write
             dat_to_write.text = new_code
             print(f"  ✓ SUCCESS: Applied {applied_count} changes to: {dat_to_write.path}")
@@ -961,8 +2031,262 @@ def apply_now():
             print(f"    ✗ Failed: {e}")
             continue
 
+    _profiler.mark('dat write')
     if not write_success:
         print(f"ERROR: Could not write to any DAT in the chain")
+        return
+
+    # Only code that reached a DAT may be used to skip unmoved sliders next time
+    _apply_memory.update(code_text=new_code, values=position_to_value)
+
+
+# ===== COALESCED APPLY (SLIDER DRAGS) =====
+
+# Slider changes are batched and applied once per interval - frames, or milliseconds if set
+APPLY_INTERVAL_FRAMES = 1
+APPLY_INTERVAL_MS = None
+
+_apply_state = {
+    'pending': False,    # Slider values changed since the last apply
+    'scheduled': False,  # A flush is queued with run()
+    'running': False,    # apply_now() is executing
+    'requests': 0,
+    'applies': 0,
+    'pushes': 0          # Live-mode value pushes that replaced an apply
+}
+
+
+def set_apply_interval(frames=None, milliseconds=None):
+    """Set how often coalesced applies run - every N frames, or every N milliseconds"""
+    global APPLY_INTERVAL_FRAMES, APPLY_INTERVAL_MS
+    if milliseconds:
+        APPLY_INTERVAL_MS = milliseconds
+    else:
+        APPLY_INTERVAL_MS = None
+        APPLY_INTERVAL_FRAMES = max(1, int(frames or 1))
+
+
+def request_apply():
+    """
+    Queue an apply of the current slider values - call this from parameter callbacks.
+
+    Any number of requests before the next flush collapse into one apply_now(),
+    at most one apply runs at a time, and the flush reads the sliders when it
+    runs, so the latest values always win.
+    """
+    _apply_state['requests'] += 1
+    _apply_state['pending'] = True
+    if not _apply_state['scheduled'] and not _apply_state['running']:
+        _schedule_apply()
+
+
+def _schedule_apply():
+    _apply_state['scheduled'] = True
+    if APPLY_INTERVAL_MS:
+        run(_flush_apply, delayMilliSeconds=APPLY_INTERVAL_MS, delayRef=op.TDResources)
+    else:
+        run(_flush_apply, delayFrames=APPLY_INTERVAL_FRAMES, delayRef=op.TDResources)
+
+
+def _flush_apply():
+    _apply_state['scheduled'] = False
+    if not _apply_state['pending']:
+        return
+
+    _apply_state['pending'] = False
+    _apply_state['running'] = True
+    try:
+        if LIVE_PARAMS_MODE and push_live_params():
+            _apply_state['pushes'] += 1
+        else:
+            apply_now()
+            _apply_state['applies'] += 1
+            if LIVE_PARAMS_MODE:
+                # The rewritten scene re-runs as literal code - swap the live version back in
+                run(send_live_code, delayFrames=1, delayRef=op.TDResources)
+    finally:
+        _apply_state['running'] = False
+
+    # Sliders moved while applying - pick them up on the next interval
+    if _apply_state['pending']:
+        _schedule_apply()
+
+
+def get_apply_stats():
+    """Requests received vs applies actually run by the coalescing scheduler"""
+    return {
+        'requests': _apply_state['requests'],
+        'applies': _apply_state['applies'],
+        'pushes': _apply_state['pushes'],
+        'unmoved_skipped': _apply_memory['skipped'],
+        'pending': _apply_state['pending'],
+        'interval': f"{APPLY_INTERVAL_MS}ms" if APPLY_INTERVAL_MS else f"{APPLY_INTERVAL_FRAMES} frame(s)"
+    }
+
+
+# ===== LIVE PARAMETER MODE (UNIFORM INJECTION) =====
+
+# When on, sync_now sends the scene with its parameter literals replaced by
+# () => window.tdParams[i], and slider changes only push the value array -
+# Hydra keeps its compiled shaders instead of rebuilding them per change.
+LIVE_PARAMS_MODE = False
+
+CODE_GENERATOR_PATH = '/project1/hydra_system/data/DataBridge/code_generator'
+HYDRA_RENDER_PATHS = [
+    '/project1/hydra_system/core/HydraCore/hydra_render',
+    '/project1/hydra_system/output/OutputRouter/output_o0',
+    '/project1/hydra_system/output/OutputRouter/output_o1',
+    '/project1/hydra_system/output/OutputRouter/output_o2',
+    '/project1/hydra_system/output/OutputRouter/output_o3'
+]
+
+_live_state = {
+    'code_text': None,  # Scene text the live code was built from
+    'live_code': None,  # Code sent to Hydra, literals replaced by live references
+    'pars': [],         # Par per parameter position (None if missing)
+    'static': [],       # (position, num_str) literals still baked into the live code
+}
+
+
+def _position_pars(grouped_param_info, created_params):
+    """One Par per parameter position - RGB groups expand to their r, g, b channels"""
+    pars = []
+    for info in grouped_param_info:
+        actual_param = created_params.get(info['name'])
+
+        if info.get('is_rgb_group'):
+            for channel in range(info['num_channels']):
+                pars.append(actual_param[channel] if actual_param is not None else None)
+        else:
+            pars.append(actual_param)
+    return pars
+
+
+def build_live_code(code_text, plan=None):
+    """
+    Replace parameter literals with live references to window.tdParams.
+
+    Only literals that are a whole call argument are replaced - osc(10, 0.1)
+    becomes osc(() => window.tdParams[0], () => window.tdParams[1]). Literals
+    inside expressions or arrays (.rotate(3.14/4), [0.2, 0.8]) stay baked in;
+    changing those still needs a full apply.
+
+    Args:
+        code_text: Scene code
+        plan: Parameter plan for code_text (looked up in the plan cache if None)
+
+    Returns:
+        (live_code, live_positions) - live_positions is the set of replaced positions
+    """
+    if plan is None:
+        plan = get_parameter_plan(code_text)
+    valid_matches = plan['valid_matches']
+
+    live_positions = set(hydra_code_parser.whole_argument_indices(code_text, valid_matches))
+    replacements = [(start, end, f"() => window.tdParams[{i}]")
+                    for i, (num_str, start, end) in enumerate(valid_matches)
+                    if i in live_positions]
+    return hydra_code_parser.splice(code_text, replacements), live_positions
+
+
+def _read_live_values():
+    """Current slider values per position, or None if a parameter has gone away"""
+    values = []
+    for par in _live_state['pars']:
+        if par is None:
+            values.append(0.0)
+            continue
+        try:
+            values.append(float(par.eval()))
+        except Exception:
+            return None
+    return values
+
+
+def push_live_params():
+    """
+    Push the current slider values to every Hydra renderer.
+
+    Returns:
+        False if a full apply is needed instead - the scene changed since the
+        live code was sent, or a slider for a baked-in literal moved
+    """
+    scene_code = get_current_scene_code()
+    if not scene_code or scene_code.text != _live_state['code_text']:
+        return False
+
+    values = _read_live_values()
+    if values is None:
+        return False
+
+    for position, num_str in _live_state['static']:
+        if values[position] != float(num_str):
+            return False
+
+    script = "updateFromTD(" + json.dumps(json.dumps({'__params': values})) + ")"
+    for path in HYDRA_RENDER_PATHS:
+        render_top = op(path)
+        if render_top:
+            render_top.executeJavaScript(script)
+    return True
+
+
+def send_live_code(plan=None, created_params=None):
+    """
+    Send the live version of the current scene through the code generator.
+
+    Called by sync_now when LIVE_PARAMS_MODE is on. Values are pushed first so
+    the references resolve on the first frame. {{...}} CHOP templates are still
+    injected by the code generator as usual.
+    """
+    scene_code = get_current_scene_code()
+    if not scene_code:
+        print("ERROR: No current scene code found")
+        return
+
+    code_text = scene_code.text
+    if plan is None or plan['code_text'] != code_text:
+        plan = get_parameter_plan(code_text)
+    if created_params is None:
+        param_page, created_params = ensure_parameters_with_context(stable_param_info(plan))
+        if not param_page:
+            return
+
+    live_code, live_positions = build_live_code(code_text, plan)
+    _live_state['code_text'] = code_text
+    _live_state['live_code'] = live_code
+    _live_state['pars'] = _position_pars(stable_param_info(plan), created_params)
+    _live_state['static'] = [(i, match[0]) for i, match in enumerate(plan['valid_matches'])
+                             if i not in live_positions]
+
+    push_live_params()
+
+    code_generator = op(CODE_GENERATOR_PATH)
+    if not code_generator:
+        print(f"ERROR: Code generator not found at {CODE_GENERATOR_PATH}")
+        return
+    code_generator.module.generateAndExecute(live_code)
+    print(f"Live parameters: {len(live_positions)} live, {len(_live_state['static'])} baked in")
+
+
+def enable_live_params(enabled=True):
+    """Switch live parameter mode on or off"""
+    global LIVE_PARAMS_MODE
+    LIVE_PARAMS_MODE = enabled
+
+    if enabled:
+        print("\n=== LIVE PARAMETER MODE ON ===")
+        send_live_code()
+        return
+
+    print("\n=== LIVE PARAMETER MODE OFF ===")
+    # Bake the current slider values into the scene and run the literal code again
+    apply_now()
+    scene_code = get_current_scene_code()
+    code_generator = op(CODE_GENERATOR_PATH)
+    if scene_code and code_generator:
+        code_generator.module.generateAndExecute(scene_code.text)
+    _live_state.update(code_text=None, live_code=None, pars=[], static=[])
 
 
 def test_both():
@@ -974,99 +2298,37 @@ def test_both():
     apply_now()
 
 
+@profiled('remove_unused_parameters')
 def remove_unused_parameters():
     """Remove parameters that are not needed for the current scene"""
-    print("\n=== REMOVING UNUSED PARAMETERS ===")
+    log("\n=== REMOVING UNUSED PARAMETERS ===")
 
     # Get current scene code dynamically
     scene_code = get_current_scene_code()
+    _profiler.mark('scene lookup')
     if not scene_code:
         print("ERROR: No current scene code found")
         return
 
-    print(f"Analyzing scene: {scene_code.path}")
+    log(f"Analyzing scene: {scene_code.path}")
 
     # Extract numbers and generate parameter info (same as sync_now)
     code_text = scene_code.text
-    pattern = r'-?\d+\.?\d*|-?\.\d+'
-    all_matches = list(re.finditer(pattern, code_text))
-
-    # Find all {{...}} blocks to skip numbers inside them
-    brace_blocks = list(re.finditer(r'\{\{[^}]*\}\}', code_text))
-    brace_ranges = [(b.start(), b.end()) for b in brace_blocks]
-
-    # Find all arrow function blocks to skip numbers inside them
-    arrow_pattern = r'\([^)]*\)\s*=>\s*[^,)]*'
-    arrow_blocks = list(re.finditer(arrow_pattern, code_text))
-    arrow_ranges = [(a.start(), a.end()) for a in arrow_blocks]
-
-    # Filter out {{null references
-    valid_matches = []
-    for match in all_matches:
-        start_pos = match.start()
-
-        # Check if this number is inside any {{...}} block
-        inside_braces = any(block_start <= start_pos < block_end
-                          for block_start, block_end in brace_ranges)
-
-        # Check if this number is inside any arrow function
-        inside_arrow = any(arrow_start <= start_pos < arrow_end
-                         for arrow_start, arrow_end in arrow_ranges)
-
-        # Check for special patterns in preceding text
-        preceding_text = code_text[max(0, start_pos-30):start_pos]
-        has_skip_pattern = any(skip_pattern in preceding_text for skip_pattern in [
-            'time', 'Math.', 'PI', 'frame', 'width', 'height', '=>'
-        ])
-
-        # Skip if inside braces, arrow function, or has special pattern
-        if not inside_braces and not inside_arrow and not has_skip_pattern:
-            valid_matches.append((match.group(), match.start(), match.end()))
 
     # Analyze context to get the parameter names we need
-    param_info = analyze_parameter_context(code_text, valid_matches)
-    grouped_param_info = group_color_parameters(param_info)
+    grouped_param_info = stable_param_info(get_parameter_plan(code_text))
     needed_param_names = set(info['name'] for info in grouped_param_info)
 
-    print(f"Current scene needs {len(needed_param_names)} parameters: {sorted(needed_param_names)}")
-
-    # Get parameter page
-    controller = op('/project1/hydra_system/direct_param_controller')
-    param_page = None
-    for page in controller.customPages:
-        if page.name == "HydraParams":
-            param_page = page
-            break
+    log(f"Current scene needs {len(needed_param_names)} parameters: {sorted(needed_param_names)}")
 
+    # Destroy every parameter the plan doesn't name - RGB tuplets go as a whole
+    param_page, kept_params = reconcile_parameters(grouped_param_info, create=False, remove_unused=True)
     if not param_page:
         print("ERROR: HydraParams page not found")
         return
+    removed_count = _reconcile_stats['removed']
 
-    # Collect all user parameters and determine which to remove
-    all_user_params = []
-    params_to_remove = []
-
-    for par in param_page.pars:
-        if not par.name.startswith('_'):  # Skip system parameters
-            all_user_params.append(par)
-            # Remove parameters whose names are NOT in the needed set
-            if par.name not in needed_param_names:
-                params_to_remove.append(par)
-
-    user_param_count = len(all_user_params)
-    print(f"Found {user_param_count} user parameters, {len(params_to_remove)} are unused")
-
-    # Remove unused parameters
-    removed_count = 0
-    for param in params_to_remove:
-        try:
-            param_name = param.name
-            param.destroy()
-            print(f"  Removed: {param_name}")
-            removed_count += 1
-        except Exception as e:
-            print(f"  Warning: Could not remove parameter: {e}")
-
+    _profiler.mark('parameter removal')
     if removed_count > 0:
         print(f"SUCCESS: Removed {removed_count} unused parameters")
     else:
@@ -1075,7 +2337,7 @@ def remove_unused_parameters():
 
 def cleanup_and_sync():
     """Remove unused parameters and then sync with current scene"""
-    print("\n=== CLEANUP AND SYNC ===")
+    log("\n=== CLEANUP AND SYNC ===")
     remove_unused_parameters()
     sync_now()
 
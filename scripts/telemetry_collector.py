@@ -0,0 +1,305 @@
+"""
+Telemetry collector for the Hydra pages
+Receives the samples each page pushes over a WebSocket (html/fragments/telemetry.js)
+and exposes the latest as CHOP channels plus a rolling CSV log, so frame-time
+spikes can be lined up with code applies after a show
+
+Each sample covers one interval (250ms by default): fps, frame-time
+percentiles and max, the code applies in it with their eval time and the
+duration of the frame that followed (where the shader compile lands), the
+CHOP update rate and latency, and the frames over the page's frame budget.
+
+The page also keeps a frame-time histogram since the last reset, with what ran
+before each over-budget frame - see reset_frame_stats() / request_frame_stats().
+
+Install as a textDAT named 'telemetry_collector' in DataBridge, next to:
+  - a Web Server DAT (port 9980) whose callbacks DAT forwards text messages:
+        def onWebSocketReceiveText(webServerDAT, client, data):
+            op('telemetry_collector').module.receive(data)
+  - a Script CHOP whose callbacks DAT builds the channels:
+        def onCook(scriptOp):
+            op('telemetry_collector').module.cook_chop(scriptOp)
+
+Then start the pages pushing (again after reloading a page):
+    op('telemetry_collector').module.start(['/project1/hydra_system/output/OutputRouter/output_o0'],
+                                           chop='telemetry')
+
+Channels are named <source>_<field> (output_o0_fps, output_o0_frame_p99, ...)
+where source is the Web Render TOP's name; <source>_age is the seconds since
+its last sample. No TouchDesigner dependencies beyond op().
+"""
+
+import csv
+import json
+import os
+import time
+
+# Sample fields, in CHOP channel and CSV column order
+FIELDS = ('fps', 'frames', 'frame_p50', 'frame_p95', 'frame_p99', 'frame_max',
+          'applies', 'apply_eval_ms', 'apply_frame_ms', 'chop_rate', 'chop_latency',
+          'over_budget')
+
+DEFAULT_PORT = 9980
+DEFAULT_INTERVAL_MS = 250
+
+# Relative to the project folder
+DEFAULT_LOG_PATH = os.path.join('logs', 'hydra_telemetry.csv')
+
+# Rolling log - start a new file past LOG_MAX_BYTES, keeping LOG_BACKUPS old ones
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+
+class TelemetryLog:
+    """CSV log that rolls over to name.1.csv, name.2.csv, ... once it gets too large"""
+
+    COLUMNS = ('td_time', 'page_time', 'source') + FIELDS
+
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(self.COLUMNS)
+
+    def _backup_path(self, number):
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}.{number}{ext}"
+
+    def _roll_over(self):
+        self.close()
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(self._backup_path(number)):
+                os.replace(self._backup_path(number), self._backup_path(number + 1))
+        if self.backups > 0:
+            os.replace(self.path, self._backup_path(1))
+        else:
+            os.remove(self.path)
+
+    def write(self, rows):
+        """Append rows (sequences in COLUMNS order) and flush"""
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.rows += len(rows)
+        if self._file.tell() >= self.max_bytes:
+            self._roll_over()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+
+class TelemetryCollector:
+    """Latest sample per page, plus the log every sample goes to"""
+
+    def __init__(self, log=None):
+        self.log = log
+        self.latest = {}      # source -> {field: value}
+        self.sample_times = {}  # source -> TD time of its last sample
+        self.frame_stats = {}   # source -> last histogram summary sent with sendFrameStats()
+        self.received = 0
+        self.errors = 0
+
+    def receive(self, message):
+        """
+        Take one message from a page.
+
+        Args:
+            message: JSON {"source": name, "samples": [{field: value, "t": ms}, ...]},
+                or {"source": name, "frameStats": {...}} from sendFrameStats()
+
+        Returns:
+            Number of samples taken
+        """
+        try:
+            data = json.loads(message)
+            source = str(data.get('source') or 'page')
+            if 'frameStats' in data:
+                self.frame_stats[source] = data['frameStats']
+                print_frame_stats(source, data['frameStats'])
+                return 0
+            samples = data['samples']
+            if not isinstance(samples, list):
+                raise TypeError('samples is not a list')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.errors += 1
+            return 0
+
+        now = time.time()
+        rows = []
+        for sample in samples:
+            try:
+                values = {field: float(sample.get(field) or 0) for field in FIELDS}
+                page_time = float(sample.get('t') or 0) / 1000
+            except (ValueError, TypeError, AttributeError):
+                self.errors += 1
+                continue
+            self.latest[source] = values
+            rows.append([f"{now:.3f}", f"{page_time:.3f}", source] +
+                        [f"{values[field]:.3f}" for field in FIELDS])
+
+        if rows:
+            self.sample_times[source] = now
+            self.received += len(rows)
+            if self.log is not None:
+                self.log.write(rows)
+        return len(rows)
+
+    def channels(self):
+        """[(channel name, value), ...] for every page, in a stable order"""
+        now = time.time()
+        channels = []
+        for source in sorted(self.latest):
+            values = self.latest[source]
+            channels.extend((f"{source}_{field}", values[field]) for field in FIELDS)
+            channels.append((f"{source}_age", now - self.sample_times[source]))
+        return channels
+
+
+def print_frame_stats(source, stats):
+    """Textport summary of a page's histogram, with what ran before each over-budget frame"""
+    try:
+        print(f"{source}: {stats['frames']} frames in {stats['seconds']:.0f}s - "
+              f"p50 {stats['p50']:.1f}ms, p95 {stats['p95']:.1f}ms, p99 {stats['p99']:.1f}ms, "
+              f"max {stats['maxMs']:.1f}ms, {stats['overBudget']} over {stats['budgetMs']:.1f}ms budget")
+        for jank in stats['jank']:
+            when = time.strftime('%H:%M:%S', time.localtime(jank['t'] / 1000))
+            print(f"  {when} {jank['ms']:6.1f}ms after {', '.join(jank['after'])}")
+    except (KeyError, TypeError, ValueError):
+        print(f"{source}: malformed frame stats")
+
+
+_collector = TelemetryCollector()
+_chop_path = None
+
+
+def _default_log_path():
+    try:
+        return os.path.join(project.folder, DEFAULT_LOG_PATH)
+    except NameError:
+        return DEFAULT_LOG_PATH
+
+
+def receive(message):
+    """Web Server DAT onWebSocketReceiveText callback body - takes the samples and recooks the CHOP"""
+    taken = _collector.receive(message)
+    if taken and _chop_path:
+        chop = op(_chop_path)
+        if chop:
+            chop.cook(force=True)
+    return taken
+
+
+def cook_chop(scriptOp):
+    """Script CHOP onCook callback body - one sample per channel"""
+    scriptOp.clear()
+    scriptOp.numSamples = 1
+    for name, value in _collector.channels():
+        scriptOp.appendChan(name)[0] = value
+
+
+def start(targets, port=DEFAULT_PORT, interval_ms=DEFAULT_INTERVAL_MS, log_path=None, chop=None):
+    """
+    Start the pages pushing telemetry to this collector.
+
+    Args:
+        targets: Web Render TOPs (or paths) to collect from
+        port: Port of the Web Server DAT receiving the samples
+        interval_ms: Sample interval on the pages
+        log_path: CSV log (default logs/hydra_telemetry.csv in the project folder), '' for none
+        chop: Script CHOP (or path) to recook as samples arrive
+    """
+    global _chop_path
+    if _collector.log is not None:
+        _collector.log.close()
+    if log_path is None:
+        log_path = _default_log_path()
+    _collector.log = TelemetryLog(log_path) if log_path else None
+    if chop is not None:
+        _chop_path = chop if isinstance(chop, str) else chop.path
+
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            target.executeJavaScript(
+                f"startTelemetry('ws://127.0.0.1:{port}', {int(interval_ms)}, {json.dumps(target.name)})")
+    print(f"Telemetry: {len(targets)} page(s) -> port {port}, log {log_path or 'off'}")
+
+
+def stop(targets):
+    """Stop the pages pushing and close the log"""
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            target.executeJavaScript("stopTelemetry()")
+    if _collector.log is not None:
+        _collector.log.close()
+
+
+def reset_frame_stats(targets, fps=None):
+    """
+    Start a new frame-time histogram on each page, e.g. at the top of a set.
+
+    Args:
+        targets: Web Render TOPs (or paths)
+        fps: Output frame rate, to set the frame budget (1000 / fps ms)
+    """
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            if fps:
+                target.executeJavaScript(f"setFrameBudget({1000.0 / fps})")
+            target.executeJavaScript("resetFrameStats()")
+
+
+def request_frame_stats(targets):
+    """
+    Have each page push its histogram summary - p50/p95/p99, frames over
+    budget and the last over-budget frames with the applies and CHOP updates
+    that ran before them - to the collector, which prints it and keeps it in
+    get_frame_stats(). Needs start() first.
+    """
+    for target in targets:
+        if isinstance(target, str):
+            target = op(target)
+        if target:
+            target.executeJavaScript("sendFrameStats()")
+
+
+def get_frame_stats():
+    """Last histogram summary per page from request_frame_stats()"""
+    return dict(_collector.frame_stats)
+
+
+def get_telemetry_stats():
+    """Samples received, malformed messages, log rows written and the pages heard from"""
+    return {
+        'received': _collector.received,
+        'errors': _collector.errors,
+        'log_rows': _collector.log.rows if _collector.log is not None else 0,
+        'sources': sorted(_collector.latest)
+    }
+
+
+def reset_telemetry():
+    """Forget the pages' latest samples - their channels disappear until they send again"""
+    _collector.latest.clear()
+    _collector.sample_times.clear()
@@ -1,8 +1,19 @@
 """
 Helper functions to trace from selectDAT back to original source textDAT
 For use with Hydra Parameter Creation system
+
+Reaches the parameter engine through its DAT (manual_triggers), like the rest
+of the project - a textDAT has no file path to import from.
 """
 
+# Name of the textDAT holding manual_triggers_fixed.py
+ENGINE_DAT = 'manual_triggers'
+
+
+def _engine():
+    return op(ENGINE_DAT).module
+
+
 def trace_to_source_dat(dat_op):
     """
     Trace from a DAT (possibly a selectDAT) back to the original source textDAT.
@@ -10,62 +21,28 @@ def trace_to_source_dat(dat_op):
     Follows the chain:
     selectDAT in CodeManager -> SceneCodeSender textDAT -> original SceneCode textDAT
 
+    Uses the cached chain from manual_triggers_fixed, so this and apply_now()
+    always agree on the source.
+
     Args:
         dat_op: The DAT operator to trace from
 
     Returns:
-        The original source textDAT, or the input dat_op if no source found
+        The original source textDAT, or the end of the chain if no source found
     """
 
     print(f"\n=== TRACING SOURCE FOR: {dat_op.path} ===")
-    print(f"  DAT type: {dat_op.OPType}")
-
-    # Step 1: Check if this is a selectDAT
-    if dat_op.OPType == 'selectDAT':
-        print("  This is a selectDAT, checking selected input...")
-
-        # Get the selectDAT's input
-        if dat_op.inputs:
-            # Get the selected index
-            select_index = int(dat_op.par.index.eval())
-            print(f"  Select index: {select_index}")
-
-            # Get the input at that index
-            if len(dat_op.inputs) > select_index:
-                input_dat = dat_op.inputs[select_index]
-                if input_dat:
-                    print(f"  Selected input: {input_dat.path}")
-                    # Recursively trace from the selected input
-                    return trace_to_source_dat(input_dat)
-                else:
-                    print("  WARNING: Selected input is None")
-            else:
-                print(f"  WARNING: Select index {select_index} out of range")
-        else:
-            print("  WARNING: selectDAT has no inputs")
-
-    # Step 2: Check if this DAT has inputs (could be connected from another DAT)
-    elif dat_op.inputs and len(dat_op.inputs) > 0:
-        input_dat = dat_op.inputs[0]
-        if input_dat:
-            print(f"  DAT has input: {input_dat.path}")
-
-            # Check if the input has the SceneCode tag
-            if 'SceneCode' in input_dat.tags:
-                print(f"  ✓ Found source with SceneCode tag: {input_dat.path}")
-                return input_dat
-
-            # Otherwise continue tracing
-            return trace_to_source_dat(input_dat)
-
-    # Step 3: Check if this DAT itself has the SceneCode tag (it's the source)
-    if 'SceneCode' in dat_op.tags:
-        print(f"  ✓ This DAT has SceneCode tag, it's the source: {dat_op.path}")
-        return dat_op
-
-    # Step 4: Fallback - return the current DAT
-    print(f"  ✓ Using current DAT as source (end of chain): {dat_op.path}")
-    return dat_op
+    entry = _engine().get_source_entry(dat_op)
+    for dat in entry['chain']:
+        tags_str = f" (tags: {', '.join(dat.tags)})" if dat.tags else ""
+        print(f"  {dat.path} [{dat.OPType}]{tags_str}")
+
+    source = entry['source']
+    if 'SceneCode' in source.tags:
+        print(f"  ✓ Found source with SceneCode tag: {source.path}")
+    else:
+        print(f"  ✓ Using current DAT as source (end of chain): {source.path}")
+    return source
 
 
 def get_source_for_current_scene():
@@ -77,14 +54,8 @@ def get_source_for_current_scene():
         Tuple of (scene_code_dat_in_codemanager, source_textdat_to_write_to)
     """
 
-    # Import the existing function
-    import sys
-    import os
-    sys.path.insert(0, os.path.dirname(__file__))
-    from manual_triggers_fixed import get_current_scene_code
-
     # Get the current scene code (the selectDAT in CodeManager)
-    scene_code = get_current_scene_code()
+    scene_code = _engine().get_current_scene_code()
 
     if not scene_code:
         print("ERROR: Could not find current scene code")
@@ -2,6 +2,34 @@
 Update the manual_triggers DAT in TouchDesigner with the latest fixed code
 """
 
+SCRIPTS_DIR = r'C:/Users/cuban/HydraToTD/scripts'
+
+# Pure-Python modules imported by manual_triggers - installed as sibling textDATs
+COMPANION_MODULES = ['hydra_code_parser']
+
+
+def update_companion_modules(controller):
+    """Create or refresh the module DATs that manual_triggers imports by name"""
+    for module_name in COMPANION_MODULES:
+        script_path = f'{SCRIPTS_DIR}/{module_name}.py'
+        try:
+            with open(script_path, 'r', encoding='utf-8') as f:
+                module_code = f.read()
+        except Exception as e:
+            print(f"ERROR: Could not read {script_path}: {e}")
+            return False
+
+        module_dat = controller.op(module_name)
+        if not module_dat:
+            print(f"  Creating {module_name} DAT...")
+            module_dat = controller.create(textDAT, module_name)
+
+        module_dat.text = module_code
+        print(f"  ✓ Updated module: {module_dat.path}")
+
+    return True
+
+
 def update_manual_triggers():
     """Update the manual_triggers DAT with the fixed source tracing code"""
 
@@ -21,7 +49,7 @@ def update_manual_triggers():
     print(f"Type: {triggers_dat.OPType}")
 
     # Read the updated code from file
-    script_path = r'C:/Users/cuban/HydraToTD/scripts/manual_triggers_fixed.py'
+    script_path = f'{SCRIPTS_DIR}/manual_triggers_fixed.py'
 
     try:
         with open(script_path, 'r', encoding='utf-8') as f:
@@ -33,6 +61,10 @@ def update_manual_triggers():
         print(f"ERROR: Could not read file: {e}")
         return False
 
+    # Modules must exist before manual_triggers is recompiled and imports them
+    if not update_companion_modules(triggers_dat.parent()):
+        return False
+
     # Try to update the DAT
     try:
         # Check if locked